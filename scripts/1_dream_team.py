@@ -1,10 +1,9 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import os
-import base64
-import plotly.express as px
 from streamlit.components.v1 import html as st_html
+from models.data_registry import dataset_path, load_dataset
+from models.dream_team_views import build_views, data_version
+from models.asset_store import AssetStore, asset_version
+from models.figure_factory import dream_team_figures
 
 st.set_page_config(page_title="Dream Team NBA", layout="wide", page_icon="🏀")
 st.markdown(
@@ -31,38 +30,70 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# 1. Charger les fichiers
-df_team = pd.read_csv("Data final/dream_teams_2000_2024.csv", sep=";")
-df_infos = pd.read_csv("Data final/df_final_players_stats.csv")
-
-tab1, tab2 = st.tabs(["🏀 Dream Team", "📊 Stats d'Équipe"])
-
-# ✅ Debug : afficher les colonnes si besoin
+# 1. Charger les fichiers : vues de toutes les saisons, calculées une fois par version des CSV
+@st.cache_resource(max_entries=1)
+def load_views(version):
+    """{saison: {rang: LineupView}}, objets partagés sans copie entre les reruns"""
+    return build_views(load_dataset("dream_teams"), load_dataset("final_players_stats"))
+
+version = data_version(dataset_path("dream_teams"), dataset_path("final_players_stats"))
+views = load_views(version)
+
+@st.cache_resource(max_entries=64)
+def load_figures(version, saison, rang):
+    """Graphiques de l'onglet statistiques, construits une fois par lineup et version des CSV"""
+    view = load_views(version)[saison][rang]
+    return dream_team_figures(view.stats_somme, view.stats_moyenne, view.predicted_win)
+
+@st.cache_resource(max_entries=1)
+def load_asset_store(version):
+    """Photos des joueurs (vignettes de build_assets.py) encodées une fois pour toutes les sessions"""
+    return AssetStore()
+
+assets = load_asset_store(asset_version())
+
+# Onglets : seul l'onglet ouvert est construit (st.tabs exécute le contenu de tous les onglets)
+ONGLETS = ["🏀 Dream Team", "📊 Stats d'Équipe"]
+onglet = st.radio("Onglet", ONGLETS, horizontal=True, label_visibility="collapsed", key="onglet")
+st.title("🏀 Dream Team de la saison" if onglet == ONGLETS[0] else "📊 Statistiques globales de l'équipe")
+
+# 2. Sélection de la saison (commune aux deux onglets)
+view = None
+if views:
+    saisons = sorted(views)
+    col_left, col_center, col_right = st.columns([1, 6, 1])
+    with col_center:
+        saison_choisie = st.select_slider(
+            "", 
+            options=saisons,
+            value=saisons[0],
+            help="Glisse ou clique sur une saison"
+)
 
-with tab1:
-    st.title("🏀 Dream Team de la saison")
-    # 2. Sélection de la saison
-    if "season" in df_team.columns:
-        saisons = sorted(df_team["season"].dropna().unique())
-        col_left, col_center, col_right = st.columns([1, 6, 1])
-        with col_center:
-            saison_choisie = st.select_slider(
-                "", 
-                options=saisons,
-                value=saisons[0],
-                help="Glisse ou clique sur une saison"
-    )
 
+    # 3. Lineup(s) de cette saison
+    season_views = views[saison_choisie]
 
-        # 3. Filtrer les joueurs de cette saison
-        dream_team = df_team[df_team["season"] == saison_choisie]
+    # Alternatives : le CSV peut contenir les K meilleures lineups (colonne rank)
+    rangs = sorted(season_views)
+    rang_choisi = rangs[0]
+    if len(rangs) > 1:
+        rang_choisi = st.radio(
+            "Lineup",
+            rangs,
+            horizontal=True,
+            format_func=lambda r: "Dream Team" if r == 1 else f"Alternative #{int(r) - 1}"
+        )
+    view = season_views[rang_choisi]
 
+if onglet == ONGLETS[0]:
+    if view is not None:
         # 4. Affichage horizontal des joueurs avec flèches
             # 4. Affichage avec flèches gauche/droite (avec boucle)
         st.subheader("Joueurs sélectionnés")
 
         # Liste des joueurs
-        player_names = dream_team["player_name"].tolist()
+        player_names = view.player_names
         total_players = len(player_names)
         player_line = ", ".join([f"<strong>{name}</strong>" for name in player_names])
         st.markdown(
@@ -93,10 +124,8 @@ with tab1:
         with col2:
             st.markdown(f"### **{selected_player}**", unsafe_allow_html=True)
 
-        # Récupération de la ligne joueur
-        row = dream_team[dream_team["player_name"] == selected_player].iloc[0]
-        infos = df_infos[df_infos["player_name"] == selected_player]
-        infos = infos.iloc[0] if not infos.empty else None
+        # Fiche du joueur (précalculée)
+        infos = view.infos.get(selected_player)
 
         # Affichage des infos joueur
         # Affichage des infos joueur AVEC PHOTO
@@ -107,28 +136,17 @@ with tab1:
                 col_photo, col_desc = st.columns([1, 2], gap="large")  # gauche = image, droite = texte
 
                 with col_photo:
-                    player_image_base = selected_player.replace(" ", "_")
-                    extensions = [".jpg", ".jpeg", ".png", ".JPG", ".JPEG", ".PNG"]
-                    image_path = None
-
-                    for ext in extensions:
-                        test_path = os.path.join("Photos joueurs", "photos2", player_image_base + ext)
-                        if os.path.exists(test_path):
-                            image_path = test_path
-                            break
-
-                    if image_path:
-                        with open(image_path, "rb") as f:
-                            img_bytes = f.read()
-                            encoded = base64.b64encode(img_bytes).decode()
-                            img_html = f"""
-                            <div style='display: flex; flex-direction: column; align-items: center;'>
-                                <img src='data:image/jpeg;base64,{encoded}' 
-                                    style='max-width: 180px; border-radius: 12px; margin-bottom: 0.5rem;' />
-                                <p style='font-weight: bold; text-align: center;'>{selected_player}</p>
-                            </div>
-                            """
-                            st_html(img_html, height=300)
+                    photo_uri = assets.photo_uri(selected_player)
+
+                    if photo_uri:
+                        img_html = f"""
+                        <div style='display: flex; flex-direction: column; align-items: center;'>
+                            <img src='{photo_uri}' 
+                                style='max-width: 180px; border-radius: 12px; margin-bottom: 0.5rem;' />
+                            <p style='font-weight: bold; text-align: center;'>{selected_player}</p>
+                        </div>
+                        """
+                        st_html(img_html, height=300)
                     else:
                         st.info("📸 Aucune photo disponible")
 
@@ -174,79 +192,32 @@ with tab1:
 
 
 
-with tab2:
-    st.title("📊 Statistiques globales de l'équipe")
-
-    if not dream_team.empty:
-        import plotly.express as px
-        import plotly.graph_objects as go
-
-        stats_somme = {
-            "Total Points": dream_team["pts_per_game"].sum(),
-            "Total Assists": dream_team["ast_per_game"].sum(),
-            "Total Rebounds": dream_team["reb_per_game"].sum(),
-            "REB% (sum)": dream_team["reb_pct_sum"].sum()
-        }
-
-        stats_moyenne = {
-            "OREB%": dream_team["oreb_pct"].mean(),
-            "DREB%": dream_team["dreb_pct"].mean(),
-            "True Shooting %": dream_team["ts_pct"].mean(),
-            "USG%": dream_team["usg_pct"].mean(),
-            "AST%": dream_team["ast_pct"].mean(),
-            "AST/USG Ratio": dream_team["ast_usg_ratio"].mean(),
-            "Net Rating": dream_team["net_rating"].mean()
-        }
-
-        groupes = {
-            "⚔️ Attaque": {
-                "color": "#e74c3c",
-                "somme": ["Total Points", "Total Assists"],
-                "moyenne": ["USG%", "AST%", "AST/USG Ratio"]
-            },
-            "🧱 Rebonds": {
-                "color": "#3498db",
-                "somme": ["Total Rebounds", "REB% (sum)"],
-                "moyenne": ["OREB%", "DREB%"]
-            },
-            "🎯 Efficacité & Ratios": {
-                "color": "#2ecc71",
-                "moyenne": ["Net Rating"]
-            }
-        }
-
-        predicted_win = dream_team["predicted_win_rate"].mean() if "predicted_win_rate" in dream_team.columns else None
-
-        # Removed the metric display block to avoid empty banner
+
+
+
+
+else:
+    if view is not None:
+        figures = load_figures(version, saison_choisie, rang_choisi)
+
+        def show(fig):
+            # plotly.js livré avec Streamlit (pas de CDN), thème plotly_white de la figure
+            st.plotly_chart(fig, use_container_width=True, theme=None)
 
         # ---------- LIGNE 1 : Efficacité & Chance ----------
         col1, col2, col3, col4 = st.columns([3,3,3,3], gap="large")
 
         # --- Carte Efficacité (sans True Shooting %) ---
-        # Remove "True Shooting %" from moyenne list
-        eff_stats = [stat for stat in groupes["🎯 Efficacité & Ratios"]["moyenne"] if stat != "True Shooting %"]
-        df_eff = pd.DataFrame({
-            "Stat": eff_stats,
-            "Valeur": [stats_moyenne[k] for k in eff_stats]
-        })
-        fig_eff = px.bar(
-            df_eff, x="Stat", y="Valeur", text="Valeur",
-            template="plotly_white", height=300,
-            color_discrete_sequence=[groupes["🎯 Efficacité & Ratios"]["color"]]
-        )
-        fig_eff.update_traces(marker_line_width=1, marker_line_color="white")
-        fig_eff.update_layout(margin=dict(t=20, b=20, l=20, r=20), yaxis=dict(showgrid=False), xaxis_title="")
-
         with col1:
             st.markdown(f"""
             <div class='card'>
-            <h3 style='color:{groupes["🎯 Efficacité & Ratios"]["color"]}; margin-bottom: 1rem'>
+            <h3 style='color:#2ecc71; margin-bottom: 1rem'>
                 🎯 Efficacité & Ratios
             </h3>
             </div>
             """, unsafe_allow_html=True)
 
-            st_html(fig_eff.to_html(full_html=False, include_plotlyjs='cdn'), height=300)
+            show(figures["net_rating"])
 
             with st.expander("💡 Explication"):
                 st.markdown("""
@@ -254,126 +225,69 @@ with tab2:
                 Il reflète l'efficacité globale d’une équipe sur le terrain.
                 """)
 
-
-
-
-
         # --- True Shooting % en donut ---
-        ts_pct = stats_moyenne["True Shooting %"]
-        fig_ts = go.Figure(data=[go.Pie(
-            values=[ts_pct, 1 - ts_pct], hole=0.6,
-            marker_colors=[groupes["🎯 Efficacité & Ratios"]["color"], "#ecf0f1"],
-            textinfo="none"
-        )])
-        fig_ts.update_layout(
-            showlegend=False,
-            annotations=[{"text": f"{round(ts_pct*100,1)}%", "font": {"size": 28}, "showarrow": False}],
-            template="plotly_white",
-            margin=dict(t=20, b=20, l=20, r=20),
-            height=300,
-        )
         with col2:
             st.markdown(f"""
             <div class='card'>
             <h3 style='color:#2ecc71; margin-bottom: 1rem'>🎯 True Shooting %</h3>
             </div>
             """, unsafe_allow_html=True)
-            st_html(fig_ts.to_html(full_html=False, include_plotlyjs='cdn'), height=300)
+            show(figures["ts"])
             with st.expander("💡 Explication"):
                 st.markdown("""Le True Shooting % mesure l'efficacité au tir en tenant compte des tirs à 3 pts et des lancers francs.""")
 
-
-
-        # --- Net Rating barre verticale ---
-        # (Block removed to prevent duplicate green bar in tab2)
-
         # --- Carte Chance Moyenne ---
-        primary = "#8e44ad"
-        fig_donut = go.Figure(data=[go.Pie(
-            values=[predicted_win, 1 - predicted_win], hole=0.6,
-            marker_colors=[primary, "#ecf0f1"], textinfo="none"
-        )])
-        fig_donut.update_layout(
-            showlegend=False,
-            annotations=[{"text": f"{round(predicted_win*100,1)}%", "font": {"size": 28}, "showarrow": False}],
-            template="plotly_white",
-            margin=dict(t=20, b=20, l=20, r=20),
-            height=300,
-        )
-
         with col4:
             st.markdown(f"""
             <div class='card'>
             <h3 style='color:#8e44ad; margin-bottom: 1rem'>🔮 Chance Moyenne</h3>
             </div>
             """, unsafe_allow_html=True)
-            st_html(fig_donut.to_html(full_html=False, include_plotlyjs='cdn'), height=300)
+            if "win" in figures:
+                show(figures["win"])
+            else:
+                st.info("Pas de probabilité prédite dans ce fichier")
             with st.expander("💡 Explication"):
                 st.markdown("""Probabilité moyenne de victoire calculée par le modèle sur la base des joueurs sélectionnés.""")
 
-
-
         # ---------- LIGNE 2 : Attaque & Rebonds ----------
         col5, col6, col7, col8 = st.columns(4, gap="large")
 
         # --- Total Points barre verticale ---
-        fig_pts = px.bar(x=["Total Points"], y=[stats_somme["Total Points"]], text=[round(stats_somme["Total Points"],2)],
-                         template="plotly_white", height=250, color_discrete_sequence=["#e74c3c"])
-        fig_pts.update_traces(marker_line_width=1, marker_line_color="white")
-        fig_pts.update_layout(margin=dict(t=20, b=20, l=20, r=20), yaxis=dict(showgrid=False), xaxis_title="")
         with col5:
             st.markdown(f"""
             <div class='card'>
             <h3 style='color:#e74c3c; margin-bottom: 1rem'>⚔️ Total Points</h3>
             </div>
             """, unsafe_allow_html=True)
-            st_html(fig_pts.to_html(full_html=False, include_plotlyjs='cdn'), height=300)
+            show(figures["pts"])
             with st.expander("💡 Explication"):
                 st.markdown("""Nombre total de points cumulés par les 5 joueurs de l’équipe.""")
 
-
-
         # --- Total Assists barre verticale ---
-        fig_ast = px.bar(x=["Total Assists"], y=[stats_somme["Total Assists"]], text=[round(stats_somme["Total Assists"],2)],
-                         template="plotly_white", height=250, color_discrete_sequence=["#e74c3c"])
-        fig_ast.update_traces(marker_line_width=1, marker_line_color="white")
-        fig_ast.update_layout(margin=dict(t=20, b=20, l=20, r=20), yaxis=dict(showgrid=False), xaxis_title="")
         with col6:
             st.markdown(f"""
             <div class='card'>
             <h3 style='color:#e74c3c; margin-bottom: 1rem'>⚔️ Total Assists</h3>
             </div>
             """, unsafe_allow_html=True)
-            st_html(fig_ast.to_html(full_html=False, include_plotlyjs='cdn'), height=300)
+            show(figures["ast"])
             with st.expander("💡 Explication"):
                 st.markdown("""Nombre total de passes décisives réalisées par les 5 joueurs.""")
 
-
-
         # --- USG% et AST% barres horizontales ---
-        df_usg_ast = pd.DataFrame({
-            "Stat": ["USG%", "AST%"],
-            "Valeur": [stats_moyenne["USG%"], stats_moyenne["AST%"]]
-        })
-        fig_usg_ast = px.bar(df_usg_ast, y="Stat", x="Valeur", orientation="h", text="Valeur",
-                             template="plotly_white", height=250,
-                             color_discrete_sequence=["#e74c3c", "#e74c3c"])
-        fig_usg_ast.update_traces(marker_line_width=1, marker_line_color="white")
-        fig_usg_ast.update_layout(margin=dict(t=20, b=20, l=20, r=20), xaxis=dict(showgrid=False), yaxis_title="")
         with col7:
             st.markdown(f"""
             <div class='card'>
             <h3 style='color:#e74c3c; margin-bottom: 1rem'>⚔️ Usage & Assists %</h3>
             </div>
             """, unsafe_allow_html=True)
-            st_html(fig_usg_ast.to_html(full_html=False, include_plotlyjs='cdn'), height=300)
+            show(figures["usg_ast"])
             with st.expander("💡 Explication"):
                 st.markdown("""USG% mesure l'implication d'un joueur dans les possessions offensives. AST% indique la proportion de passes menant à un panier.""")
 
-
-
         # --- AST/USG Ratio chiffre centré ---
-        ratio_val = stats_moyenne["AST/USG Ratio"]
+        ratio_val = view.stats_moyenne["AST/USG Ratio"]
         with col8:
             st.markdown(f"""
             <div class='card'>
@@ -384,80 +298,45 @@ with tab2:
             with st.expander("💡 Explication"):
                 st.markdown("""Ratio entre le pourcentage de passes décisives et le pourcentage d'utilisation. Il indique l'efficacité collective dans le jeu offensif.""")
 
-
-
         # ---------- LIGNE 3 : Rebonds ----------
         col9, col10, col11, col12 = st.columns(4, gap="large")
 
         # --- Total Rebounds barre verticale ---
-        fig_reb = px.bar(x=["Total Rebounds"], y=[stats_somme["Total Rebounds"]], text=[round(stats_somme["Total Rebounds"],2)],
-                         template="plotly_white", height=250, color_discrete_sequence=[groupes["🧱 Rebonds"]["color"]])
-        fig_reb.update_traces(marker_line_width=1, marker_line_color="white")
-        fig_reb.update_layout(margin=dict(t=20, b=20, l=20, r=20), yaxis=dict(showgrid=False), xaxis_title="")
         with col9:
             st.markdown(f"""
             <div class='card'>
             <h3 style='color:#3498db; margin-bottom: 1rem'>🧱 Total Rebounds</h3>
             </div>
             """, unsafe_allow_html=True)
-            st_html(fig_reb.to_html(full_html=False, include_plotlyjs='cdn'), height=300)
+            show(figures["reb"])
             with st.expander("💡 Explication"):
                 st.markdown("""Nombre total de rebonds cumulés par l’équipe (offensifs + défensifs).""")
 
-
-
         # --- REB% (sum) donut ---
-        reb_pct_sum = stats_somme["REB% (sum)"]
-        fig_reb_pct = go.Figure(data=[go.Pie(
-            values=[reb_pct_sum, 1 - reb_pct_sum], hole=0.6,
-            marker_colors=[groupes["🧱 Rebonds"]["color"], "#ecf0f1"],
-            textinfo="none"
-        )])
-        fig_reb_pct.update_layout(
-            showlegend=False,
-            annotations=[{"text": f"{round(reb_pct_sum*100,1)}%", "font": {"size": 28}, "showarrow": False}],
-            template="plotly_white",
-            margin=dict(t=20, b=20, l=20, r=20),
-            height=300,
-        )
         with col10:
             st.markdown(f"""
             <div class='card'>
             <h3 style='color:#3498db; margin-bottom: 1rem'>🧱 REB% (sum)</h3>
             </div>
             """, unsafe_allow_html=True)
-            st_html(fig_reb_pct.to_html(full_html=False, include_plotlyjs='cdn'), height=300)
+            show(figures["reb_pct"])
             with st.expander("💡 Explication"):
                 st.markdown("""Pourcentage combiné de rebonds pris par l’équipe par rapport aux rebonds disponibles.""")
 
-
-
         # --- OREB% et DREB% barres horizontales ---
-        df_oreb_dreb = pd.DataFrame({
-            "Stat": ["OREB%", "DREB%"],
-            "Valeur": [stats_moyenne["OREB%"], stats_moyenne["DREB%"]]
-        })
-        fig_oreb_dreb = px.bar(df_oreb_dreb, y="Stat", x="Valeur", orientation="h", text="Valeur",
-                               template="plotly_white", height=250,
-                               color_discrete_sequence=[groupes["🧱 Rebonds"]["color"], groupes["🧱 Rebonds"]["color"]])
-        fig_oreb_dreb.update_traces(marker_line_width=1, marker_line_color="white")
-        fig_oreb_dreb.update_layout(margin=dict(t=20, b=20, l=20, r=20), xaxis=dict(showgrid=False), yaxis_title="")
         with col11:
             st.markdown(f"""
             <div class='card'>
             <h3 style='color:#3498db; margin-bottom: 1rem'>🧱 Offensive & Defensive Rebounds %</h3>
             </div>
             """, unsafe_allow_html=True)
-            st_html(fig_oreb_dreb.to_html(full_html=False, include_plotlyjs='cdn'), height=300)
+            show(figures["oreb_dreb"])
             with st.expander("💡 Explication"):
                 st.markdown("""Pourcentages moyens de rebonds offensifs et défensifs captés par les joueurs.""")
 
-
-
         # Empty column for layout balance
         with col12:
             st.write("")
 
     else:
         st.warning("Aucune équipe sélectionnée.")
-        
\ No newline at end of file
@@ -1,26 +1,29 @@
 import streamlit as st
-import base64
-import pathlib
+from models.asset_store import AssetStore, asset_version
+
+
+@st.cache_resource(max_entries=1)
+def load_asset_store(version):
+    """Images encodées une fois pour toutes les sessions (vignettes de build_assets.py)"""
+    return AssetStore()
+
 
 def set_bg(png_file: str, size: str = "contain"):
     """
     Ajoute une image PNG en fond d'écran de l'app Streamlit.
-    - png_file : chemin relatif ou absolu vers l'image
+    - png_file : chemin relatif ou absolu vers l'image (version réduite du manifeste si elle existe)
     - size     : 'cover', 'contain', '50%', etc.
     """
-    file_path = pathlib.Path(png_file)
-    if not file_path.exists():
+    image_uri = load_asset_store(asset_version()).image_uri("background", png_file)
+    if image_uri is None:
         st.error(f"Image '{png_file}' introuvable")
         return
 
-    with open(png_file, "rb") as f:
-        encoded = base64.b64encode(f.read()).decode()
-
     st.markdown(
         f"""
         <style>
         .stApp {{
-            background: linear-gradient(rgba(0,0,0,0.55), rgba(0,0,0,0.55)), url("data:image/png;base64,{encoded}");
+            background: linear-gradient(rgba(0,0,0,0.55), rgba(0,0,0,0.55)), url("{image_uri}");
             background-size  : {size};
             background-repeat: no-repeat;
             background-attachment: fixed;
@@ -0,0 +1,101 @@
+"""
+Images du dashboard (photos des joueurs, fond d'écran) servies en data URIs.
+
+build_assets.py réduit les images à leur taille d'affichage et écrit un manifeste
+nom -> fichier. AssetStore lit ce manifeste une fois, encode chaque image à sa
+première demande et garde les data URIs dans un cache LRU borné, partagé entre
+les sessions (st.cache_resource) : un rerun ne lit ni n'encode plus aucune image.
+Sans manifeste, les images d'origine sont cherchées comme avant, une seule fois
+par joueur.
+"""
+
+import base64
+import json
+import os
+from typing import Dict, Optional
+
+try:
+    from .score_cache import LRUCache
+except ImportError:
+    from score_cache import LRUCache
+
+PHOTO_DIR = os.path.join("Photos joueurs", "photos2")
+ASSET_DIR = "assets"
+THUMB_DIR = os.path.join(ASSET_DIR, "thumbs")
+MANIFEST = "manifest.json"
+PHOTO_EXTENSIONS = [".jpg", ".jpeg", ".png", ".JPG", ".JPEG", ".PNG"]
+MIME_TYPES = {".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png"}
+
+
+def photo_key(player_name: str) -> str:
+    """Nom de fichier (sans extension) de la photo d'un joueur"""
+    return player_name.replace(" ", "_")
+
+
+def asset_version(thumb_dir: str = THUMB_DIR) -> Optional[tuple]:
+    """Version du manifeste (None s'il n'existe pas) : clé de cache du store"""
+    try:
+        stat = os.stat(os.path.join(thumb_dir, MANIFEST))
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class AssetStore:
+    """Data URIs des images, encodées une fois et gardées dans un LRU borné"""
+    def __init__(self, thumb_dir: str = THUMB_DIR, photo_dir: str = PHOTO_DIR, maxsize: int = 256):
+        self.thumb_dir = thumb_dir
+        self.photo_dir = photo_dir
+        self.manifest: Optional[Dict] = None
+        path = os.path.join(thumb_dir, MANIFEST)
+        if os.path.exists(path):
+            with open(path) as f:
+                self.manifest = json.load(f)
+        # Résolution nom -> fichier, absences comprises (plus de sondage des extensions)
+        self._paths: Dict[str, Optional[str]] = {}
+        self.uris = LRUCache(maxsize)
+
+    def photo_path(self, player_name: str) -> Optional[str]:
+        """Vignette du joueur si elle a été construite, sinon photo d'origine"""
+        key = photo_key(player_name)
+        if key not in self._paths:
+            path = None
+            if self.manifest is not None:
+                name = self.manifest["players"].get(key)
+                path = os.path.join(self.thumb_dir, name) if name else None
+            else:
+                for ext in PHOTO_EXTENSIONS:
+                    candidate = os.path.join(self.photo_dir, key + ext)
+                    if os.path.exists(candidate):
+                        path = candidate
+                        break
+            self._paths[key] = path
+        return self._paths[key]
+
+    def image_path(self, name: str, original: str) -> Optional[str]:
+        """Image nommée du manifeste (ex. background), sinon le fichier d'origine"""
+        if self.manifest is not None and name in self.manifest["images"]:
+            return os.path.join(self.thumb_dir, self.manifest["images"][name])
+        return original if os.path.exists(original) else None
+
+    def data_uri(self, path: Optional[str]) -> Optional[str]:
+        """data:<mime>;base64,... du fichier, encodé à la première demande"""
+        if path is None:
+            return None
+        uri = self.uris.get(path)
+        if uri is None:
+            try:
+                with open(path, "rb") as f:
+                    encoded = base64.b64encode(f.read()).decode()
+            except OSError:
+                return None
+            mime = MIME_TYPES.get(os.path.splitext(path)[1].lower(), "application/octet-stream")
+            uri = f"data:{mime};base64,{encoded}"
+            self.uris.put(path, uri)
+        return uri
+
+    def photo_uri(self, player_name: str) -> Optional[str]:
+        return self.data_uri(self.photo_path(player_name))
+
+    def image_uri(self, name: str, original: str) -> Optional[str]:
+        return self.data_uri(self.image_path(name, original))
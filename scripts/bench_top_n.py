@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark du top N par équipe : groupby.apply(nlargest) contre top_n_per_group.
+
+Exemple :
+    python bench_top_n.py                      # table "players" du registre de données
+    python bench_top_n.py --data autre.csv --sep ","
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from data_registry import get_registry
+from lineup_predictor import top_n_per_group
+
+
+def best_time(func, repeat: int) -> float:
+    """Meilleur temps sur `repeat` exécutions"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du top N par groupe")
+    parser.add_argument("--data", default=None, help="CSV des joueurs (défaut : registre)")
+    parser.add_argument("--sep", default=None)
+    parser.add_argument("--n", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    registry = get_registry()
+    data = args.data or registry.path("players")
+    sep = args.sep or (registry.spec("players")["sep"] if args.data is None else ",")
+    df = pd.read_csv(data, sep=sep)
+    df["season_year"] = df["season"].str[:4].astype(int)
+    keys = ["season_year", "team_abbreviation"]
+
+    def with_apply():
+        return df.groupby(keys).apply(lambda x: x.nlargest(args.n, "pts")).reset_index(drop=True)
+
+    def with_sort():
+        return top_n_per_group(df, keys, "pts", args.n).reset_index(drop=True)
+
+    # Mêmes lignes, dans le même ordre
+    pd.testing.assert_frame_equal(with_apply(), with_sort())
+
+    t_apply = best_time(with_apply, args.repeat)
+    t_sort = best_time(with_sort, args.repeat)
+    print(f"{len(df)} lignes, {df.groupby(keys).ngroups} groupes")
+    print(f"groupby.apply(nlargest) : {t_apply * 1000:.1f} ms")
+    print(f"top_n_per_group         : {t_sort * 1000:.1f} ms")
+    print(f"Accélération            : x{t_apply / t_sort:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Préparation des images du dashboard.
+
+Les photos des joueurs (affichées à 180 px de large) et le fond d'écran sont
+réduits à leur taille d'affichage et réencodés en JPEG dans assets/thumbs, avec un
+manifeste nom -> fichier lu par AssetStore. Seules les images modifiées depuis la
+dernière construction sont retraitées.
+
+Exemple (depuis le dossier de l'app Streamlit) :
+    python build_assets.py
+    python build_assets.py --photos "Photos joueurs/photos2" --size 360 --quality 85
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+
+from asset_store import ASSET_DIR, MANIFEST, PHOTO_DIR, PHOTO_EXTENSIONS, THUMB_DIR
+
+
+def make_thumbnail(source: str, target: str, size: int, quality: int) -> str:
+    """
+    Réduit l'image pour tenir dans size × size et l'écrit en JPEG (target sans
+    extension). Si le JPEG est plus lourd que l'original (PNG très compressible),
+    l'original est copié tel quel. Retourne le fichier écrit.
+    """
+    from PIL import Image
+
+    with Image.open(source) as original:
+        image = original
+        if image.mode != "RGB":
+            # Transparence aplatie sur fond blanc (le JPEG n'a pas de canal alpha)
+            rgba = image.convert("RGBA")
+            image = Image.new("RGB", rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.split()[-1])
+        image.thumbnail((size, size), Image.LANCZOS)
+        tmp_path = f"{target}.{os.getpid()}.tmp"
+        image.save(tmp_path, "JPEG", quality=quality, optimize=True, progressive=True)
+    if os.path.getsize(tmp_path) >= os.path.getsize(source):
+        os.remove(tmp_path)
+        written = target + os.path.splitext(source)[1].lower()
+        shutil.copyfile(source, tmp_path)
+    else:
+        written = target + ".jpg"
+    os.replace(tmp_path, written)
+    return written
+
+
+def is_stale(source: str, target: str) -> bool:
+    return not os.path.exists(target) or os.path.getmtime(target) < os.path.getmtime(source)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vignettes des joueurs et manifeste des images du dashboard")
+    parser.add_argument("--photos", default=PHOTO_DIR, help="dossier des photos d'origine")
+    parser.add_argument("--background", default=os.path.join(ASSET_DIR, "background.png"))
+    parser.add_argument("--output", default=THUMB_DIR)
+    parser.add_argument("--size", type=int, default=360, help="côté max des vignettes (2× l'affichage)")
+    parser.add_argument("--background-size", type=int, default=1920)
+    parser.add_argument("--quality", type=int, default=85)
+    args = parser.parse_args()
+
+    start = time.time()
+    os.makedirs(os.path.join(args.output, "players"), exist_ok=True)
+    manifest = {"size": args.size, "players": {}, "images": {}}
+    # Manifeste précédent : fichiers déjà construits, réutilisés s'ils sont à jour
+    previous = {"players": {}, "images": {}}
+    manifest_file = os.path.join(args.output, MANIFEST)
+    if os.path.exists(manifest_file):
+        with open(manifest_file) as f:
+            previous = json.load(f)
+    jobs = []
+
+    # Photos : une par joueur, extensions sondées dans l'ordre du dashboard (PHOTO_EXTENSIONS)
+    if os.path.isdir(args.photos):
+        keys = sorted({key for key, ext in map(os.path.splitext, os.listdir(args.photos))
+                       if ext in PHOTO_EXTENSIONS})
+        for key in keys:
+            for ext in PHOTO_EXTENSIONS:
+                source = os.path.join(args.photos, key + ext)
+                if os.path.exists(source):
+                    manifest["players"][key] = None
+                    jobs.append((source, "players", key, args.size))
+                    break
+    else:
+        print(f"Dossier de photos introuvable : {args.photos}")
+
+    if os.path.exists(args.background):
+        jobs.append((args.background, "images", "background", args.background_size))
+
+    built = before = after = 0
+    for source, group, key, size in jobs:
+        name = previous[group].get(key)
+        if name is None or is_stale(source, os.path.join(args.output, name)):
+            prefix = os.path.join(group, key) if group == "players" else key
+            target = make_thumbnail(source, os.path.join(args.output, prefix), size, args.quality)
+            name = os.path.relpath(target, args.output)
+            built += 1
+        manifest[group][key] = name
+        before += os.path.getsize(source)
+        after += os.path.getsize(os.path.join(args.output, name))
+
+    tmp_path = f"{manifest_file}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_file)
+
+    print(f"{len(jobs)} images ({built} reconstruites) en {time.time() - start:.1f}s : "
+          f"{before / 2 ** 20:.1f} Mo -> {after / 2 ** 20:.1f} Mo")
+    print(f"Manifeste écrit dans {manifest_file}")
+
+
+if __name__ == "__main__":
+    main()
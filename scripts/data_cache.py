@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Cache colonnaire des fichiers CSV.
+
+Au premier accès, un CSV est converti en fichier binaire colonnaire (Parquet si
+pyarrow est installé, sinon un dossier avec un pickle pandas par colonne) dans un
+dossier `.cache` à côté de la source. Les lectures suivantes ne chargent que les
+colonnes demandées. Le cache est
+invalidé quand la source change (date de modification / taille, puis contenu).
+
+Exemple (pré-construction des caches) :
+    python data_cache.py "Data final/df_v1.csv" --sep ";"
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# À incrémenter quand le format des fichiers de cache change (2 : un pickle par colonne sans pyarrow)
+CACHE_VERSION = 2
+
+# Colonnes texte très répétées, stockées en category (noms, équipes)
+CATEGORICAL_COLUMNS = ("player_name", "team_abbreviation", "team_name")
+
+
+def file_digest(path: str) -> str:
+    """sha256 du contenu d'un fichier"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_paths(path: str, sep: str, cache_dir: Optional[str] = None) -> Dict[str, str]:
+    """Chemins du fichier de cache et de ses métadonnées pour une source"""
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(path)), '.cache')
+    # Le séparateur fait partie de la clé : le même fichier lu autrement donne une autre table
+    tag = hashlib.sha1(f"{os.path.abspath(path)}|{sep}".encode()).hexdigest()[:10]
+    stem = f"{os.path.splitext(os.path.basename(path))[0]}.{tag}"
+    ext = '.parquet' if HAS_PYARROW else '.columns'
+    return {
+        'data': os.path.join(cache_dir, stem + ext),
+        'meta': os.path.join(cache_dir, stem + ext + '.json'),
+    }
+
+
+def _source_meta(path: str, sep: str, categorical: Sequence[str]) -> Dict:
+    stat = os.stat(path)
+    return {
+        'version': CACHE_VERSION,
+        'format': 'parquet' if HAS_PYARROW else 'columns',
+        'sep': sep,
+        'categorical': sorted(categorical),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+    }
+
+
+def _is_fresh(path: str, paths: Dict[str, str], meta: Dict) -> bool:
+    """Vrai si le cache correspond à la source ; met à jour la date si seul le mtime a changé"""
+    if not (os.path.exists(paths['data']) and os.path.exists(paths['meta'])):
+        return False
+    with open(paths['meta']) as f:
+        cached = json.load(f)
+    same_options = all(cached.get(k) == meta[k] for k in ('version', 'format', 'sep', 'categorical'))
+    if not same_options or cached.get('size') != meta['size']:
+        return False
+    if cached.get('mtime_ns') == meta['mtime_ns']:
+        return True
+    # Fichier touché (copie, checkout...) : on compare le contenu avant de reconvertir
+    if cached.get('sha256') != file_digest(path):
+        return False
+    cached['mtime_ns'] = meta['mtime_ns']
+    _write_json(paths['meta'], cached)
+    return True
+
+
+def _write_json(path: str, payload: Dict):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+def _to_categorical(df: pd.DataFrame, categorical: Sequence[str]) -> pd.DataFrame:
+    for col in categorical:
+        if col in df.columns and df[col].dtype == object:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def _write_columns(df: pd.DataFrame, directory: str):
+    """Un pickle par colonne (i.pkl) et la liste des colonnes (columns.json) dans `directory`"""
+    tmp_dir = f"{directory}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    for i, col in enumerate(df.columns):
+        df[col].to_pickle(os.path.join(tmp_dir, f"{i}.pkl"))
+    with open(os.path.join(tmp_dir, 'columns.json'), 'w') as f:
+        json.dump(list(df.columns), f)
+    # Un dossier ne se remplace pas d'un bloc : l'ancien est écarté puis supprimé
+    old_dir = f"{directory}.{os.getpid()}.old"
+    if os.path.exists(directory):
+        os.replace(directory, old_dir)
+    os.replace(tmp_dir, directory)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def _read_columns(directory: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Relit les seules colonnes demandées d'un dossier écrit par _write_columns"""
+    with open(os.path.join(directory, 'columns.json')) as f:
+        names = json.load(f)
+    wanted = names if columns is None else list(columns)
+    missing = [col for col in wanted if col not in names]
+    if missing:
+        raise KeyError(f"{missing} not in index")
+    return pd.DataFrame({col: pd.read_pickle(os.path.join(directory, f"{names.index(col)}.pkl"))
+                         for col in wanted}, columns=wanted)
+
+
+def build_cache(path: str, sep: str = ',', categorical: Sequence[str] = CATEGORICAL_COLUMNS,
+                cache_dir: Optional[str] = None) -> pd.DataFrame:
+    """Convertit le CSV en fichier colonnaire et retourne la table complète"""
+    paths = cache_paths(path, sep, cache_dir)
+    meta = _source_meta(path, sep, categorical)
+    meta['sha256'] = file_digest(path)
+    df = _to_categorical(pd.read_csv(path, sep=sep), categorical)
+
+    os.makedirs(os.path.dirname(paths['data']), exist_ok=True)
+    # Écriture atomique : données puis métadonnées, un lecteur concurrent voit l'ancien ou le nouveau cache
+    if HAS_PYARROW:
+        tmp_path = f"{paths['data']}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, paths['data'])
+    else:
+        _write_columns(df, paths['data'])
+    _write_json(paths['meta'], meta)
+    return df
+
+
+def read_table(path: str, columns: Optional[List[str]] = None, sep: str = ',',
+               categorical: Sequence[str] = CATEGORICAL_COLUMNS,
+               cache_dir: Optional[str] = None) -> pd.DataFrame:
+    """
+    Lit un CSV via son cache colonnaire (créé ou régénéré si besoin).
+    `columns` limite la lecture aux colonnes utiles ; si le cache ne peut pas être
+    écrit (dossier en lecture seule), on retombe sur pd.read_csv.
+    """
+    paths = cache_paths(path, sep, cache_dir)
+    meta = _source_meta(path, sep, categorical)
+    try:
+        if not _is_fresh(path, paths, meta):
+            df = build_cache(path, sep, categorical, cache_dir)
+            return df[columns] if columns is not None else df
+    except OSError:
+        df = pd.read_csv(path, sep=sep, usecols=columns)
+        df = _to_categorical(df, categorical)
+        return df[columns] if columns is not None else df
+
+    if HAS_PYARROW:
+        return pd.read_parquet(paths['data'], columns=columns)
+    try:
+        return _read_columns(paths['data'], columns)
+    except FileNotFoundError:
+        # Cache remplacé pendant la lecture par un autre processus
+        df = _to_categorical(pd.read_csv(path, sep=sep, usecols=columns), categorical)
+        return df[columns] if columns is not None else df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pré-construit les caches colonnaires des CSV")
+    parser.add_argument("paths", nargs="+", help="fichiers CSV sources")
+    parser.add_argument("--sep", default=",", help="séparateur des CSV")
+    parser.add_argument("--cache-dir", default=None)
+    args = parser.parse_args()
+
+    for path in args.paths:
+        start = time.perf_counter()
+        pd.read_csv(path, sep=args.sep)
+        csv_time = time.perf_counter() - start
+
+        build_cache(path, args.sep, cache_dir=args.cache_dir)
+        start = time.perf_counter()
+        df = read_table(path, sep=args.sep, cache_dir=args.cache_dir)
+        cache_time = time.perf_counter() - start
+        memory = df.memory_usage(deep=True).sum() / 1e6
+        print(f"{path}: CSV {csv_time * 1000:.1f} ms, cache {cache_time * 1000:.1f} ms, "
+              f"{memory:.1f} Mo en mémoire")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Registre des jeux de données.
+
+Associe un nom logique (players, draft_combine, ...) à un fichier, son format et
+les colonnes attendues. Tous les chargements passent par `load_dataset`, qui
+utilise le cache colonnaire de data_cache.
+
+Configuration (par ordre de priorité) :
+    - fichier JSON désigné par NBA_DATA_CONFIG :
+        {"root": "...", "cache_dir": "...", "datasets": {"players": {"path": "...", "sep": ";"}}}
+    - NBA_DATA_ROOT : dossier des données (défaut : "Data final")
+    - NBA_CACHE_DIR : dossier des caches colonnaires (défaut : .cache à côté des sources)
+"""
+
+import copy
+import json
+import os
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+try:
+    from .data_cache import read_table
+except ImportError:
+    from data_cache import read_table
+
+DEFAULT_ROOT = "Data final"
+
+# path : relatif à la racine ; format : csv ou parquet ; columns : colonnes obligatoires
+DATASETS = {
+    'players': {
+        'path': 'df_v1.csv', 'format': 'csv', 'sep': ';',
+        'columns': ['player_name', 'team_abbreviation', 'season', 'position', 'gp',
+                    'pts', 'reb', 'ast', 'net_rating', 'oreb_pct', 'dreb_pct',
+                    'usg_pct', 'ts_pct', 'ast_pct', 'win_rate'],
+    },
+    'draft_combine': {
+        'path': 'df_draft_combine_cleaned.csv', 'format': 'csv', 'sep': ',',
+        'columns': ['player_name'],
+    },
+    'game_summary': {
+        'path': 'df_game_summary_cleaned.csv', 'format': 'csv', 'sep': ',',
+        'columns': ['game_id', 'season', 'home_team_id', 'visitor_team_id'],
+    },
+    'games': {
+        'path': 'df_game_cleaned.csv', 'format': 'csv', 'sep': ',',
+        'columns': ['season_id', 'team_abbreviation_home', 'team_abbreviation_away', 'wl_home', 'wl_away'],
+    },
+    'dream_teams': {
+        'path': 'dream_teams_2000_2024.csv', 'format': 'csv', 'sep': ';',
+        'columns': ['season', 'player_name'],
+    },
+    'final_players_stats': {
+        'path': 'df_final_players_stats.csv', 'format': 'csv', 'sep': ',',
+        'columns': ['player_name'],
+    },
+    'prefab_teams': {
+        'path': 'player_team_statistics.csv', 'format': 'csv', 'sep': ';',
+        'columns': ['team_name', 'player_name'],
+    },
+    'team_level_stats': {
+        'path': 'nba_team_statistics_final_without_players.csv', 'format': 'csv', 'sep': ';',
+        'columns': ['team_name'],
+    },
+}
+
+
+class DataRegistry:
+    """Résout les noms logiques en chemins et charge les tables"""
+    def __init__(self, root: str = DEFAULT_ROOT, datasets: Optional[Dict[str, Dict]] = None,
+                 cache_dir: Optional[str] = None):
+        self.root = root
+        self.cache_dir = cache_dir
+        self.datasets = copy.deepcopy(DATASETS)
+        for name, overrides in (datasets or {}).items():
+            self.datasets.setdefault(name, {'format': 'csv', 'sep': ',', 'columns': []})
+            self.datasets[name].update(overrides)
+
+    @classmethod
+    def from_env(cls) -> 'DataRegistry':
+        """Registre configuré par NBA_DATA_CONFIG / NBA_DATA_ROOT / NBA_CACHE_DIR"""
+        config = {}
+        config_path = os.environ.get('NBA_DATA_CONFIG')
+        if config_path:
+            with open(config_path) as f:
+                config = json.load(f)
+        root = os.environ.get('NBA_DATA_ROOT', config.get('root', DEFAULT_ROOT))
+        cache_dir = os.environ.get('NBA_CACHE_DIR', config.get('cache_dir'))
+        return cls(root=root, datasets=config.get('datasets'), cache_dir=cache_dir)
+
+    def spec(self, name: str) -> Dict:
+        if name not in self.datasets:
+            raise KeyError(f"Jeu de données inconnu : {name} (disponibles : {sorted(self.datasets)})")
+        return self.datasets[name]
+
+    def path(self, name: str) -> str:
+        """Chemin du fichier (les chemins absolus de la config sont conservés)"""
+        return os.path.join(self.root, self.spec(name)['path'])
+
+    def file(self, filename: str) -> str:
+        """Chemin d'un fichier annexe (artefacts...) dans la racine des données"""
+        return os.path.join(self.root, filename)
+
+    def load(self, name: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Charge la table `name`, éventuellement limitée à `columns`"""
+        spec = self.spec(name)
+        path = self.path(name)
+        if spec['format'] == 'parquet':
+            df = pd.read_parquet(path, columns=columns)
+        elif spec['format'] == 'csv':
+            df = read_table(path, columns=columns, sep=spec.get('sep', ','), cache_dir=self.cache_dir)
+        else:
+            raise ValueError(f"Format non supporté pour {name} : {spec['format']}")
+
+        expected = spec.get('columns', []) if columns is None else columns
+        missing = [col for col in expected if col not in df.columns]
+        if missing:
+            raise ValueError(f"{path} : colonnes manquantes {missing}")
+        return df
+
+
+_REGISTRY = None
+
+
+def get_registry() -> DataRegistry:
+    """Registre partagé, construit depuis l'environnement au premier appel"""
+    global _REGISTRY
+    if _REGISTRY is None:
+        _REGISTRY = DataRegistry.from_env()
+    return _REGISTRY
+
+
+def set_registry(registry: Optional[DataRegistry]):
+    """Remplace le registre partagé (None : relire l'environnement au prochain appel)"""
+    global _REGISTRY
+    _REGISTRY = registry
+
+
+def load_dataset(name: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    return get_registry().load(name, columns)
+
+
+def dataset_path(name: str) -> str:
+    return get_registry().path(name)
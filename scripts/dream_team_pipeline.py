@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Calcul des Dream Teams de toutes les saisons en parallèle.
+
+Remplace la boucle `main()` du notebook "NBA partie 1" : chaque saison est traitée
+par un processus du pool (entraînement RF / GB sur les autres saisons, puis recherche
+de la meilleure lineup). La table des joueurs est chargée une seule fois puis
+partagée avec les processus sous forme de tableaux NumPy mappés en mémoire ; la
+table agrégée top 5 par (saison, équipe) est calculée une seule fois et chaque
+saison en extrait son jeu d'entraînement par masque. Elle est sauvegardée
+(AGGREGATES_FILE) pour que incremental_update.py n'y ajoute qu'une saison.
+
+Exemple :
+    python dream_team_pipeline.py --workers 8          # table "players" du registre de données
+    python dream_team_pipeline.py --data ../Data/df_v1.csv --sep , --workers 8
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+from sklearn.metrics import mean_squared_error, r2_score
+
+from data_cache import read_table
+from data_registry import get_registry, load_dataset
+from dream_team_search import DreamTeamSearch, get_primary_pos
+from lineup_predictor import TeamAggregateStore
+from tuning import RESOURCES, TuningCache, make_estimator, tune_seasons
+
+FEATURES_ALL = [
+    "pts_per_game", "reb_per_game", "ast_per_game",
+    "oreb_pct", "dreb_pct", "usg_pct", "ts_pct", "ast_pct",
+    "net_rating", "ast_usg_ratio", "reb_pct_sum"
+]
+# Table agrégée du pipeline, dans la racine des données (reprise par incremental_update.py)
+AGGREGATES_FILE = "pipeline_aggregates.pkl"
+# Colonnes numériques partagées avec les processus (features + colonnes de tri + cible)
+NUMERIC_COLUMNS = FEATURES_ALL + ["pts", "win_rate"]
+# Colonnes catégorielles, partagées sous forme de codes entiers
+CODE_COLUMNS = ["season", "team_abbreviation", "player_name", "position", "primary_pos"]
+
+MODELS = {
+    "rf": ("RandomForest", lambda: RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=1)),
+    "gb": ("GradientBoosting", lambda: GradientBoostingRegressor(random_state=42)),
+}
+
+# Tableaux partagés, initialisés une fois par processus
+_SHARED = {}
+
+
+def add_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Feature engineering du notebook"""
+    df["pts_per_game"] = df["pts"] / df["gp"]
+    df["reb_per_game"] = df["reb"] / df["gp"]
+    df["ast_per_game"] = df["ast"] / df["gp"]
+    df["ast_usg_ratio"] = df["ast_pct"] / (df["usg_pct"] + 1e-6)
+    df["reb_pct_sum"] = df["oreb_pct"] + df["dreb_pct"]
+    return df
+
+
+def share_table(df: pd.DataFrame, directory: str) -> Dict[str, list]:
+    """
+    Écrit la table des joueurs en tableaux .npy (valeurs numériques + codes) dans
+    `directory` et retourne les catégories nécessaires pour décoder les codes.
+    """
+    np.save(os.path.join(directory, "numeric.npy"),
+            df[NUMERIC_COLUMNS].to_numpy(dtype=np.float64))
+    categories, codes = {}, []
+    for col in CODE_COLUMNS:
+        cat = pd.Categorical(df[col])
+        categories[col] = list(cat.categories)
+        codes.append(cat.codes.astype(np.int32))
+    np.save(os.path.join(directory, "codes.npy"), np.stack(codes, axis=1))
+    return categories
+
+
+def _init_worker(directory: str, categories: Dict[str, list], store: TeamAggregateStore):
+    """Ouvre les tableaux partagés en lecture seule (mmap) dans le processus"""
+    _SHARED["numeric"] = np.load(os.path.join(directory, "numeric.npy"), mmap_mode="r")
+    _SHARED["codes"] = np.load(os.path.join(directory, "codes.npy"), mmap_mode="r")
+    _SHARED["categories"] = categories
+    _SHARED["store"] = store
+
+
+def _shared_frame() -> pd.DataFrame:
+    """DataFrame construit sur les tableaux partagés"""
+    numeric = pd.DataFrame(_SHARED["numeric"], columns=NUMERIC_COLUMNS, copy=False)
+    for i, col in enumerate(CODE_COLUMNS):
+        numeric[col] = pd.Categorical.from_codes(
+            np.asarray(_SHARED["codes"][:, i]), categories=_SHARED["categories"][col]
+        )
+    return numeric
+
+
+def evaluate_model(model, X, y):
+    """Évalue le modèle avec RMSE et R² sur les données fournies"""
+    y_pred = model.predict(X)
+    rmse = np.sqrt(mean_squared_error(y, y_pred))
+    r2 = r2_score(y, y_pred) if len(y) > 1 else np.nan
+    return {'rmse': rmse, 'r2': r2}
+
+
+def model_output(path: str, key: str, models: List[str]) -> str:
+    """Fichier de sortie d'un modèle : suffixe _<modèle> s'il y en a plusieurs"""
+    if len(models) == 1:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}_{key}{ext}"
+
+
+def run_season(season: str, models: List[str], top_net: int, center_net: int,
+               top_k: int, max_shared, tuned: Optional[Dict[str, Dict]] = None):
+    """
+    Entraîne les modèles sans la saison puis calcule sa Dream Team
+    (tuned : hyperparamètres réglés de chaque modèle pour cette saison).
+    """
+    df = _shared_frame()
+    is_season = (df["season"] == season).to_numpy()
+
+    # Entraînement sur toutes les autres saisons, validation sur la saison
+    train_df, test_df = _SHARED["store"].fold(season)
+    df_season = df[is_season].copy()
+    df_season["primary_pos"] = df_season["primary_pos"].astype(object)
+
+    dreams, metrics = [], {"season": season}
+    for key in models:
+        name, factory = MODELS[key]
+        start = time.time()
+        model = make_estimator(key, **tuned[key]) if tuned and key in tuned else factory()
+        # Tableaux NumPy : la recherche prédit sur des matrices sans noms de colonnes
+        model.fit(train_df[FEATURES_ALL].to_numpy(), train_df["win_rate"].to_numpy())
+        scores = evaluate_model(model, test_df[FEATURES_ALL].to_numpy(), test_df["win_rate"].to_numpy())
+        metrics.update({f"{key}_rmse": scores["rmse"], f"{key}_r2": scores["r2"]})
+
+        search = DreamTeamSearch(model, FEATURES_ALL, top_net=top_net, center_net=center_net)
+        if top_k > 1 or max_shared is not None:
+            dream = search.top_k(df_season, k=top_k, season=season, max_shared=max_shared)
+        else:
+            dream = search.search(df_season, season=season)
+        metrics[f"{key}_time"] = time.time() - start
+        dream["model"] = name
+        dreams.append(dream)
+    return season, dreams, metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dream Teams 2000-2024 en parallèle")
+    parser.add_argument("--data", default=None,
+                        help="CSV fusionné des joueurs (défaut : jeu 'players' du registre)")
+    parser.add_argument("--sep", default=",", help="séparateur du CSV")
+    parser.add_argument("--start", type=int, default=2000)
+    parser.add_argument("--end", type=int, default=2024)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--models", nargs="+", default=["rf"], choices=sorted(MODELS))
+    parser.add_argument("--top-net", type=int, default=10)
+    parser.add_argument("--center-net", type=int, default=5)
+    parser.add_argument("--top-k", type=int, default=1, help="nombre de lineups par saison")
+    parser.add_argument("--max-shared", type=int, default=None,
+                        help="joueurs communs max entre deux lineups d'une même saison")
+    parser.add_argument("--output", default="dream_teams_2000_2024.csv")
+    parser.add_argument("--metrics", default="model_metrics_2000_2024.csv")
+    parser.add_argument("--tune", action="store_true",
+                        help="régler les hyperparamètres de chaque saison (successive halving)")
+    parser.add_argument("--tune-resource", default="n_estimators", choices=RESOURCES)
+    parser.add_argument("--tune-budget", type=float, default=None,
+                        help="secondes de recherche par modèle (au-delà : derniers paramètres trouvés) ; "
+                             "vérifié avant chaque recherche, la dernière peut le dépasser de sa durée")
+    parser.add_argument("--tune-cache", default="tuning_cache.json")
+    parser.add_argument("--tune-log", default="tuning_log.csv")
+    parser.add_argument("--aggregates", default=None,
+                        help=f"table agrégée sauvegardée (défaut : {AGGREGATES_FILE} du registre)")
+    args = parser.parse_args()
+
+    # 1. Charger et préparer la table une seule fois
+    df = load_dataset("players") if args.data is None else read_table(args.data, sep=args.sep)
+    df = add_features(df)
+    df["primary_pos"] = df["position"].apply(get_primary_pos)
+    available = set(df["season"].unique())
+    seasons = [f"{year}-{str(year + 1)[-2:]}" for year in range(args.start, args.end + 1)]
+    seasons = [s for s in seasons if s in available]
+    store = TeamAggregateStore().build(df, FEATURES_ALL)
+    store.save(args.aggregates or get_registry().file(AGGREGATES_FILE))
+
+    # Réglage des hyperparamètres avant la répartition (résultats en cache réutilisés)
+    tuned = {season: {} for season in seasons}
+    if args.tune:
+        cache = TuningCache(args.tune_cache)
+        logs = []
+        for key in args.models:
+            folds = ((s, *store.training_set(FEATURES_ALL, exclude=s)) for s in seasons)
+            params, log = tune_seasons(folds, cache, key, args.tune_resource, budget=args.tune_budget)
+            for season, season_params in params.items():
+                tuned[season][key] = season_params
+            logs.append(log)
+            print(f"{MODELS[key][0]} : réglage en {log['time'].sum():.1f}s")
+        pd.concat(logs, ignore_index=True).to_csv(args.tune_log, index=False)
+        print(f"Journal du réglage sauvegardé dans {args.tune_log}")
+
+    # 2. Répartir les saisons sur le pool de processus
+    results = {}
+    start = time.time()
+    with tempfile.TemporaryDirectory() as directory:
+        categories = share_table(df, directory)
+        del df
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                                 initargs=(directory, categories, store)) as pool:
+            futures = [
+                pool.submit(run_season, season, args.models, args.top_net, args.center_net,
+                            args.top_k, args.max_shared, tuned[season])
+                for season in seasons
+            ]
+            for future in futures:
+                season, dreams, metrics = future.result()
+                results[season] = (dreams, metrics)
+                print(f"{season} terminée")
+    print(f"{len(seasons)} saisons en {time.time() - start:.1f}s ({args.workers} processus)")
+
+    # 3. Fusion déterministe : ordre des saisons puis des modèles
+    for i, key in enumerate(args.models):
+        dreams = pd.concat([results[s][0][i] for s in seasons], ignore_index=True)
+        dreams = dreams.rename(columns={"player": "player_name"})
+        if args.top_k == 1 and args.max_shared is None:
+            dreams = dreams.drop(columns="rank", errors="ignore")
+        output = model_output(args.output, key, args.models)
+        # Format lu par le dashboard Dream Team (séparateur ;)
+        dreams.to_csv(output, sep=";", index=False)
+        print(f"Dream teams saved to {output}")
+
+    pd.DataFrame([results[s][1] for s in seasons]).to_csv(args.metrics, index=False)
+    print(f"Métriques sauvegardées dans {args.metrics}")
+
+
+if __name__ == "__main__":
+    main()
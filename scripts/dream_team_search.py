@@ -0,0 +1,211 @@
+import pandas as pd
+import numpy as np
+import heapq
+from typing import Dict, List, Optional
+
+try:
+    from .forest_inference import COMPILED_MAX_BATCH, CompiledForest
+except ImportError:
+    from forest_inference import COMPILED_MAX_BATCH, CompiledForest
+
+# Composition imposée de la Dream Team : 2 Guards, 2 Forwards, 1 Center
+POSITIONS = ["G", "F", "C"]
+
+
+def get_primary_pos(pos):
+    if pd.isna(pos):
+        return np.nan
+    if "Guard" in pos and "Center" not in pos:
+        return "G"
+    if "Center" in pos:
+        return "C"
+    if "Forward" in pos:
+        return "F"
+    return np.nan
+
+
+class DreamTeamSearch:
+    """Recherche exhaustive vectorisée de la meilleure lineup 2G/2F/1C"""
+
+    def __init__(self, model, features: List[str], top_net: int = 10, center_net: int = 5,
+                 batch_size: int = 65536, compiled: bool = False):
+        self.model = model
+        # compiled : forêt aplatie en tableaux NumPy pour les petits lots (batch_size au plus
+        # COMPILED_MAX_BATCH) ; les lots plus grands restent notés par sklearn
+        self.compiled = CompiledForest.from_sklearn(model) if compiled else None
+        self.features = features
+        self.top_net = top_net
+        self.center_net = center_net
+        self.batch_size = batch_size
+        # Compteurs de la dernière recherche (lineups évaluées / élaguées)
+        self.last_stats = {}
+
+    def _predict(self, X: np.ndarray) -> np.ndarray:
+        if self.compiled is not None and len(X) <= COMPILED_MAX_BATCH:
+            return self.compiled.predict(X)
+        return self.model.predict(X)
+
+    def select_candidates(self, df_season: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """Sélectionne les meilleurs candidats par poste selon le net_rating"""
+        if "primary_pos" not in df_season.columns:
+            df_season = df_season.copy()
+            df_season["primary_pos"] = df_season["position"].apply(get_primary_pos)
+        return {
+            "G": df_season[df_season["primary_pos"] == "G"].nlargest(self.top_net, "net_rating"),
+            "F": df_season[df_season["primary_pos"] == "F"].nlargest(self.top_net, "net_rating"),
+            "C": df_season[df_season["primary_pos"] == "C"].nlargest(self.center_net, "net_rating"),
+        }
+
+    @staticmethod
+    def _pairs(n: int) -> np.ndarray:
+        """Toutes les paires (i < j) dans l'ordre de itertools.combinations"""
+        i, j = np.triu_indices(n, k=1)
+        return np.stack([i, j], axis=1).astype(np.int32)
+
+    def _layout(self, candidates: Dict[str, pd.DataFrame]):
+        """Matrice des features des candidats (G puis F puis C) et paires d'indices"""
+        n_g, n_f, n_c = (len(candidates[p]) for p in POSITIONS)
+        feats = np.concatenate(
+            [candidates[p][self.features].to_numpy(dtype=np.float64) for p in POSITIONS]
+        )
+        g_pairs = self._pairs(n_g)
+        f_pairs = self._pairs(n_f) + n_g
+        centers = np.arange(n_c, dtype=np.int32) + n_g + n_f
+        return feats, g_pairs, f_pairs, centers
+
+    @staticmethod
+    def combination_indices(g_pairs: np.ndarray, f_pairs: np.ndarray, centers: np.ndarray,
+                            start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """
+        Tenseur (N, 5) des indices de joueurs pour les combinaisons [start, stop).
+        L'ordre est celui des boucles imbriquées G → F → C du notebook.
+        """
+        total = len(g_pairs) * len(f_pairs) * len(centers)
+        stop = total if stop is None else min(stop, total)
+        flat = np.arange(start, stop, dtype=np.int64)
+        g, f, c = np.unravel_index(flat, (len(g_pairs), len(f_pairs), len(centers)))
+        return np.concatenate([g_pairs[g], f_pairs[f], centers[c][:, None]], axis=1)
+
+    def lineup_features(self, feats: np.ndarray, combos: np.ndarray) -> np.ndarray:
+        """Moyenne des features des 5 joueurs pour chaque combinaison"""
+        return feats[combos].mean(axis=1)
+
+    def score_all(self, candidates: Dict[str, pd.DataFrame]):
+        """Score toutes les combinaisons par lots ; retourne (scores, g_pairs, f_pairs, centers)"""
+        feats, g_pairs, f_pairs, centers = self._layout(candidates)
+        total = len(g_pairs) * len(f_pairs) * len(centers)
+        scores = np.empty(total, dtype=np.float64)
+        for start in range(0, total, self.batch_size):
+            combos = self.combination_indices(g_pairs, f_pairs, centers, start, start + self.batch_size)
+            scores[start:start + len(combos)] = self._predict(self.lineup_features(feats, combos))
+        return scores, g_pairs, f_pairs, centers
+
+    def search(self, df_season: pd.DataFrame, season: Optional[str] = None) -> pd.DataFrame:
+        """Retourne la Dream Team de la saison au format du notebook"""
+        candidates = self.select_candidates(df_season)
+        scores, g_pairs, f_pairs, centers = self.score_all(candidates)
+        self.last_stats = {"evaluated": len(scores), "pruned": 0, "total": len(scores)}
+        if len(scores) == 0:
+            return pd.DataFrame()
+
+        best = int(np.argmax(scores))
+        lineup = self.combination_indices(g_pairs, f_pairs, centers, best, best + 1)[0]
+        return self._to_frame(candidates, lineup, scores[best], season)
+
+    def _scan_top(self, feats, g_pairs, f_pairs, centers, size: int) -> List[tuple]:
+        """
+        Parcours par lots en ne gardant que les `size` meilleures lineups dans un tas.
+        Retourne [(score, indice de combinaison)] trié par score décroissant, puis par
+        indice croissant (même départage que la recherche exhaustive).
+        """
+        total = len(g_pairs) * len(f_pairs) * len(centers)
+        # Tas min sur (score, -indice) : la racine est la lineup la moins bonne gardée
+        heap = []
+        for start in range(0, total, self.batch_size):
+            combos = self.combination_indices(g_pairs, f_pairs, centers, start, start + self.batch_size)
+            scores = self._predict(self.lineup_features(feats, combos))
+            if len(heap) == size and scores.max() < heap[0][0]:
+                continue
+            # Pré-sélection vectorisée du lot avant de passer par le tas
+            keep = np.arange(len(scores))
+            if len(scores) > size:
+                keep = np.argpartition(-scores, size - 1)[:size]
+                # Conserver aussi les ex-aequo du seuil pour respecter le départage par indice
+                keep = np.flatnonzero(scores >= scores[keep].min())
+            for i in keep:
+                item = (scores[i], -(start + int(i)))
+                if len(heap) < size:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+        return [(score, -neg) for score, neg in sorted(heap, reverse=True)]
+
+    def top_k(self, df_season: pd.DataFrame, k: int = 5, season: Optional[str] = None,
+              max_shared: Optional[int] = None) -> pd.DataFrame:
+        """
+        Retourne les k meilleures lineups de la saison (colonne `rank`, 1 = Dream Team).
+        max_shared : nombre maximal de joueurs en commun entre deux lineups retournées ;
+        la sélection est gloutonne dans l'ordre des scores. La mémoire reste en O(k) :
+        le tas est agrandi (et le parcours relancé) seulement si la contrainte de
+        diversité écarte trop de lineups.
+        """
+        candidates = self.select_candidates(df_season)
+        feats, g_pairs, f_pairs, centers = self._layout(candidates)
+        total = len(g_pairs) * len(f_pairs) * len(centers)
+        if total == 0 or k <= 0:
+            return pd.DataFrame()
+
+        names = pd.concat([candidates[p] for p in POSITIONS])["player_name"].to_numpy()
+        size = k if max_shared is None else 4 * k
+        while True:
+            ranked = self._scan_top(feats, g_pairs, f_pairs, centers, min(size, total))
+            selected = []
+            for score, index in ranked:
+                lineup = self.combination_indices(g_pairs, f_pairs, centers, index, index + 1)[0]
+                players = set(names[lineup])
+                if max_shared is not None and any(
+                        len(players & other) > max_shared for _, _, other in selected):
+                    continue
+                selected.append((score, lineup, players))
+                if len(selected) == k:
+                    break
+            # Le glouton sur les `size` meilleures est exact s'il a trouvé k lineups
+            if len(selected) == k or size >= total:
+                break
+            size *= 2
+
+        dreams = []
+        for rank, (score, lineup, _) in enumerate(selected, start=1):
+            dream = self._to_frame(candidates, lineup, score, season)
+            dream["rank"] = rank
+            dreams.append(dream)
+        return pd.concat(dreams, ignore_index=True)
+
+    def _to_frame(self, candidates: Dict[str, pd.DataFrame], lineup: np.ndarray, score: float,
+                  season: Optional[str]) -> pd.DataFrame:
+        """Assemble le DataFrame d'une lineup à partir des indices de candidats"""
+        pool = pd.concat([candidates[p] for p in POSITIONS], ignore_index=True)
+        players = pool.iloc[lineup]
+        dream = pd.DataFrame({
+            "season": season,
+            "player": players["player_name"].to_numpy(),
+            "position": players["position"].to_numpy(),
+            **{feat: players[feat].to_numpy() for feat in self.features},
+        })
+        dream["predicted_win_rate"] = score
+        return dream
+
+
+def compute_dream_team(df, season, features, model, top_net=10, center_net=5):
+    """Remplaçant vectorisé de compute_dream_team du notebook"""
+    df_season = df[df["season"] == season]
+    search = DreamTeamSearch(model, features, top_net=top_net, center_net=center_net)
+    return search.search(df_season, season=season)
+
+
+def compute_top_dream_teams(df, season, features, model, k=5, max_shared=None,
+                            top_net=10, center_net=5):
+    """Les k meilleures Dream Teams de la saison, numérotées par la colonne `rank`"""
+    df_season = df[df["season"] == season]
+    search = DreamTeamSearch(model, features, top_net=top_net, center_net=center_net)
+    return search.top_k(df_season, k=k, season=season, max_shared=max_shared)
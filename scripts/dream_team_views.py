@@ -0,0 +1,100 @@
+"""
+Vues précalculées du dashboard Dream Team.
+
+Toutes les saisons sont préparées en une passe : les joueurs de chaque lineup,
+leur fiche (df_final_players_stats) et les agrégats de l'onglet statistiques.
+Le dashboard ne fait plus qu'une lecture de dictionnaire à chaque interaction.
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# Agrégats de l'onglet "Stats d'Équipe" : libellé -> colonne du CSV des Dream Teams
+SUM_STATS = {
+    "Total Points": "pts_per_game",
+    "Total Assists": "ast_per_game",
+    "Total Rebounds": "reb_per_game",
+    "REB% (sum)": "reb_pct_sum",
+}
+MEAN_STATS = {
+    "OREB%": "oreb_pct",
+    "DREB%": "dreb_pct",
+    "True Shooting %": "ts_pct",
+    "USG%": "usg_pct",
+    "AST%": "ast_pct",
+    "AST/USG Ratio": "ast_usg_ratio",
+    "Net Rating": "net_rating",
+}
+
+
+class LineupView:
+    """Une lineup d'une saison, prête à afficher"""
+    def __init__(self, season: str, rank: int, players: pd.DataFrame, infos: Dict[str, Optional[Dict]],
+                 stats_somme: Dict[str, float], stats_moyenne: Dict[str, float],
+                 predicted_win: Optional[float]):
+        self.season = season
+        self.rank = rank
+        self.players = players
+        self.player_names: List[str] = players["player_name"].tolist()
+        self.infos = infos
+        self.stats_somme = stats_somme
+        self.stats_moyenne = stats_moyenne
+        self.predicted_win = predicted_win
+
+
+def lineup_stats(players: pd.DataFrame) -> Dict[str, float]:
+    """Sommes (SUM_STATS) et moyennes (MEAN_STATS) des joueurs d'une lineup"""
+    stats = {label: players[col].sum() for label, col in SUM_STATS.items()}
+    stats.update({label: players[col].mean() for label, col in MEAN_STATS.items()})
+    return stats
+
+
+def data_version(*paths: str) -> Tuple:
+    """Version des fichiers (taille et date de modification) : clé de cache peu coûteuse"""
+    version = []
+    for path in paths:
+        stat = os.stat(path)
+        version.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(version)
+
+
+def build_views(df_team: pd.DataFrame, df_infos: pd.DataFrame) -> Dict[str, Dict[int, LineupView]]:
+    """
+    {saison: {rang: LineupView}} (rang 1 si le CSV n'a pas de colonne rank ou si
+    le rang d'une ligne est vide).
+    La fiche d'un joueur est la première ligne à son nom, comme le filtre du dashboard.
+    """
+    if "season" not in df_team.columns:
+        return {}
+    df_team = df_team[df_team["season"].notna()].copy()
+    df_team["season"] = df_team["season"].astype(object)
+    has_rank = "rank" in df_team.columns
+    if has_rank:
+        # CSV complété par incremental_update : les saisons sans rang sont des Dream Teams seules
+        df_team["rank"] = df_team["rank"].fillna(1)
+    keys = ["season", "rank"] if has_rank else ["season"]
+
+    # Fiches des seuls joueurs affichés, une par nom
+    names = df_team["player_name"].astype(object).unique()
+    infos = df_infos[df_infos["player_name"].isin(names)].drop_duplicates("player_name")
+    infos = {row["player_name"]: row for row in infos.astype(object).to_dict("records")}
+
+    grouped = df_team.groupby(keys, sort=True, observed=True)
+    sums = grouped[list(SUM_STATS.values())].sum()
+    means = grouped[list(MEAN_STATS.values())].mean()
+    predicted = grouped["predicted_win_rate"].mean() if "predicted_win_rate" in df_team.columns else None
+
+    views: Dict[str, Dict[int, LineupView]] = {}
+    for key, rows in grouped.indices.items():
+        season, rank = (key[0], int(key[1])) if has_rank else (key, 1)
+        players = df_team.iloc[rows]
+        views.setdefault(season, {})[rank] = LineupView(
+            season, rank, players,
+            {name: infos.get(name) for name in players["player_name"]},
+            {label: sums.at[key, col] for label, col in SUM_STATS.items()},
+            {label: means.at[key, col] for label, col in MEAN_STATS.items()},
+            predicted.at[key] if predicted is not None else None,
+        )
+    return views
@@ -0,0 +1,173 @@
+"""
+Figures Plotly des dashboards.
+
+Les figures sont construites ici une seule fois par (saison / paire d'équipes,
+version des données) : les pages les gardent en cache (st.cache_resource) et les
+affichent avec st.plotly_chart, qui utilise le plotly.js livré avec Streamlit
+(aucun CDN, une seule copie de la bibliothèque par page au lieu d'une par iframe).
+"""
+
+from typing import Dict, List, Optional
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+ATTACK_COLOR = "#e74c3c"
+REBOUND_COLOR = "#3498db"
+EFFICIENCY_COLOR = "#2ecc71"
+WIN_COLOR = "#8e44ad"
+EMPTY_COLOR = "#ecf0f1"
+TEAM_COLORS = {"A": ATTACK_COLOR, "B": REBOUND_COLOR}
+MARGIN = dict(t=20, b=20, l=20, r=20)
+
+
+# ---------- Dream Team : cartes d'une lineup ----------
+
+def _card_donut(value: float, color: str) -> go.Figure:
+    fig = go.Figure(data=[go.Pie(
+        values=[value, 1 - value], hole=0.6,
+        marker_colors=[color, EMPTY_COLOR], textinfo="none"
+    )])
+    fig.update_layout(
+        showlegend=False,
+        annotations=[{"text": f"{round(value * 100, 1)}%", "font": {"size": 28}, "showarrow": False}],
+        template="plotly_white", margin=MARGIN, height=300,
+    )
+    return fig
+
+
+def _card_bar(label: str, value: float, color: str) -> go.Figure:
+    fig = px.bar(x=[label], y=[value], text=[round(value, 2)],
+                 template="plotly_white", height=250, color_discrete_sequence=[color])
+    fig.update_traces(marker_line_width=1, marker_line_color="white")
+    fig.update_layout(margin=MARGIN, yaxis=dict(showgrid=False), xaxis_title="")
+    return fig
+
+
+def _card_stats(stats: Dict[str, float], color: str, horizontal: bool, height: int) -> go.Figure:
+    df = pd.DataFrame({"Stat": list(stats), "Valeur": list(stats.values())})
+    if horizontal:
+        fig = px.bar(df, y="Stat", x="Valeur", orientation="h", text="Valeur", template="plotly_white",
+                     height=height, color_discrete_sequence=[color, color])
+        fig.update_layout(margin=MARGIN, xaxis=dict(showgrid=False), yaxis_title="")
+    else:
+        fig = px.bar(df, x="Stat", y="Valeur", text="Valeur", template="plotly_white",
+                     height=height, color_discrete_sequence=[color])
+        fig.update_layout(margin=MARGIN, yaxis=dict(showgrid=False), xaxis_title="")
+    fig.update_traces(marker_line_width=1, marker_line_color="white")
+    return fig
+
+
+def dream_team_figures(stats_somme: Dict[str, float], stats_moyenne: Dict[str, float],
+                       predicted_win: Optional[float]) -> Dict[str, go.Figure]:
+    """Cartes de l'onglet "Stats d'Équipe" (win absent sans predicted_win_rate)"""
+    figures = {
+        "net_rating": _card_stats({"Net Rating": stats_moyenne["Net Rating"]}, EFFICIENCY_COLOR, False, 300),
+        "ts": _card_donut(stats_moyenne["True Shooting %"], EFFICIENCY_COLOR),
+        "pts": _card_bar("Total Points", stats_somme["Total Points"], ATTACK_COLOR),
+        "ast": _card_bar("Total Assists", stats_somme["Total Assists"], ATTACK_COLOR),
+        "usg_ast": _card_stats({k: stats_moyenne[k] for k in ("USG%", "AST%")}, ATTACK_COLOR, True, 250),
+        "reb": _card_bar("Total Rebounds", stats_somme["Total Rebounds"], REBOUND_COLOR),
+        "reb_pct": _card_donut(stats_somme["REB% (sum)"], REBOUND_COLOR),
+        "oreb_dreb": _card_stats({k: stats_moyenne[k] for k in ("OREB%", "DREB%")}, REBOUND_COLOR, True, 250),
+    }
+    if predicted_win is not None:
+        figures["win"] = _card_donut(predicted_win, WIN_COLOR)
+    return figures
+
+
+# ---------- Match predictor : comparaison de deux équipes ----------
+
+def win_donut(prob: float, title: str, color: str, suffix: str = "%") -> go.Figure:
+    fig = go.Figure(go.Pie(values=[prob, 1 - prob], labels=["Victoire", "Défaite"],
+                           hole=0.55, marker_colors=[color, EMPTY_COLOR], textinfo="none"))
+    fig.update_layout(title=title, showlegend=False,
+                      annotations=[dict(text=f"{prob * 100:.1f}{suffix}", font_size=24, showarrow=False)])
+    return fig
+
+
+def _pair_bar(statsA: Dict[str, float], statsB: Dict[str, float], stat: str, title: str) -> go.Figure:
+    fig = px.bar(
+        x=["Équipe A", "Équipe B"],
+        y=[statsA[stat], statsB[stat]],
+        color=["A", "B"],
+        text=[round(statsA[stat], 2), round(statsB[stat], 2)],
+        color_discrete_map=TEAM_COLORS,
+        template="plotly_white", height=250
+    )
+    fig.update_layout(title=title, showlegend=False)
+    return fig
+
+
+def _pair_horizontal(statsA: Dict[str, float], statsB: Dict[str, float], stats: List[str],
+                     height: int) -> go.Figure:
+    df = pd.DataFrame({
+        "Stat": stats * 2,
+        "Équipe": ["A"] * len(stats) + ["B"] * len(stats),
+        "Valeur": [statsA[s] for s in stats] + [statsB[s] for s in stats],
+    })
+    return px.bar(df, x="Valeur", y="Stat", color="Équipe", orientation="h", barmode="group",
+                  color_discrete_map=TEAM_COLORS, text_auto=".2f", height=height)
+
+
+def lineup_figures(statsA: Dict[str, float], statsB: Dict[str, float],
+                   probA: float, probB: float) -> Dict[str, go.Figure]:
+    """Graphiques du mode "2×5 joueurs" (stats agrégées des deux lineups)"""
+    usg_ast = _pair_horizontal(statsA, statsB, ["USG%", "AST%"], 300)
+    usg_ast.update_layout(title="Usage % & Assists %", xaxis=dict(showgrid=False),
+                          yaxis_title=None, xaxis_title=None)
+    oreb_dreb = _pair_horizontal(statsA, statsB, ["OREB%", "DREB%"], 250)
+    oreb_dreb.update_layout(title="🧱 Offensive & Defensive Rebounds %", showlegend=True)
+    return {
+        "donutA": win_donut(probA, "Équipe A", ATTACK_COLOR),
+        "donutB": win_donut(probB, "Équipe B", REBOUND_COLOR),
+        "usg_ast": usg_ast,
+        "pts": _pair_bar(statsA, statsB, "Total Points", "🏀 Total Points"),
+        "ast": _pair_bar(statsA, statsB, "Total Assists", "🎯 Total Assists"),
+        "ts": _pair_bar(statsA, statsB, "True Shooting %", "🎯 True Shooting %"),
+        "net": _pair_bar(statsA, statsB, "Net Rating", "📈 Net Rating"),
+        "total_reb": _pair_bar(statsA, statsB, "Total Rebounds", "🧱 Total Rebounds"),
+        "reb_sum": _pair_bar(statsA, statsB, "REB% (sum)", "📊 REB% (sum)"),
+        "oreb_dreb": oreb_dreb,
+    }
+
+
+def team_figures(teamA: str, teamB: str, rowA: Dict, rowB: Dict, probA: float, probB: float,
+                 single_stats: Dict[str, str], multi_stats: Dict[str, List[str]]) -> Dict[str, go.Figure]:
+    """
+    Graphiques du mode "équipes existantes" : un graphique par stat de
+    single_stats ({colonne: titre}) et par groupe de multi_stats ({titre: colonnes}).
+    """
+    colors = {teamA: ATTACK_COLOR, teamB: REBOUND_COLOR}
+    figures = {
+        "donutA": win_donut(probA, f"Probabilité {teamA}", ATTACK_COLOR, " %"),
+        "donutB": win_donut(probB, f"Probabilité {teamB}", REBOUND_COLOR, " %"),
+    }
+    for col, title in single_stats.items():
+        df = pd.DataFrame({"Équipe": [teamA, teamB], "Valeur": [rowA.get(col, 0), rowB.get(col, 0)]})
+        fig = px.bar(df, x="Équipe", y="Valeur", color="Équipe", text_auto=".2f",
+                     color_discrete_map=colors, height=350)
+        fig.update_layout(title=title, showlegend=False)
+        figures[col] = fig
+    for title, cols in multi_stats.items():
+        df = pd.DataFrame(
+            [{"Stat": c, "Valeur": rowA.get(c, 0), "Équipe": teamA} for c in cols] +
+            [{"Stat": c, "Valeur": rowB.get(c, 0), "Équipe": teamB} for c in cols]
+        )
+        fig = px.bar(df, x="Valeur", y="Stat", orientation="h", color="Équipe", barmode="group",
+                     text_auto=".2f", color_discrete_map=colors, height=350)
+        fig.update_layout(title=title)
+        figures[title] = fig
+    return figures
+
+
+def matchup_heatmap(frame: pd.DataFrame) -> go.Figure:
+    """Matrice des probabilités de victoire (ligne contre colonne)"""
+    fig = px.imshow(
+        frame, zmin=0, zmax=1, color_continuous_scale="RdBu_r",
+        labels=dict(x="Adversaire", y="Équipe", color="P(victoire)"),
+        height=max(400, 22 * len(frame)),
+    )
+    fig.update_layout(title="Probabilité de victoire (ligne contre colonne)")
+    return fig
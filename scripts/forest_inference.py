@@ -0,0 +1,201 @@
+"""
+Inférence compilée des forêts d'arbres (RandomForest / GradientBoosting).
+
+Les arbres sklearn entraînés sont aplatis en tableaux NumPy contigus (feature,
+seuil, enfants, valeur). La prédiction fait descendre toutes les lignes dans tous
+les arbres en même temps, un niveau par itération : max_depth étapes vectorisées
+au lieu d'un parcours arbre par arbre. Les feuilles bouclent sur elles-mêmes, ce
+qui évite tout cas particulier une fois la feuille atteinte.
+
+Pour les arbres peu profonds (cas de la forêt du LineupPredictor, max_depth=10),
+chaque arbre est complété en arbre binaire parfait : l'enfant du nœud h est
+2h+1 (gauche) ou 2h+2 (droite), il n'y a plus de tableau d'enfants à lire, et
+(seuil float32, feature int32) sont regroupés dans un seul enregistrement de
+8 octets, soit deux lectures aléatoires par niveau au lieu de quatre.
+
+Les valeurs manquantes (NaN) suivent le côté appris par sklearn pour chaque nœud
+(missing_go_to_left) ; elles passent par le parcours explicite, la disposition en
+arbre parfait ne garde pas ce côté. Une forêt qui n'accepte pas les NaN dans sklearn
+(GradientBoosting) les refuse aussi ici.
+
+Le gain porte sur les petits lots (une requête, quelques lineups) : au-delà de
+COMPILED_MAX_BATCH lignes, la prédiction de sklearn est plus rapide et les
+appelants repassent par le modèle sklearn.
+
+Charger et utiliser une forêt compilée n'importe pas sklearn.
+"""
+
+import os
+from typing import Dict, Optional
+
+import numpy as np
+
+# Taille de lot au-delà de laquelle sklearn est plus rapide (100 arbres non élagués :
+# 9 ms contre 12 ms pour 256 lignes, 138 ms contre 36 ms pour 4096, 2,2 s contre 0,38 s pour 65536)
+COMPILED_MAX_BATCH = 256
+# Au-delà, la disposition en arbre parfait (2^profondeur feuilles par arbre) coûte trop de mémoire
+MAX_HEAP_DEPTH = 12
+NODE_DTYPE = np.dtype([("threshold", np.float32), ("feature", np.int32)])
+
+
+def _float32_floor(values: np.ndarray) -> np.ndarray:
+    """
+    Plus grand float32 <= chaque seuil float64 : pour x float32,
+    x > seuil  <=>  x > seuil arrondi vers le bas, la comparaison reste exacte.
+    """
+    rounded = values.astype(np.float32)
+    return np.where(rounded > values, np.nextafter(rounded, np.float32(-np.inf)), rounded)
+
+
+class CompiledForest:
+    """Forêt aplatie : prédiction = offset + scale * somme des feuilles atteintes"""
+    ARRAYS = ("feature", "threshold", "children", "value", "roots")
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, children: np.ndarray,
+                 value: np.ndarray, roots: np.ndarray, max_depth: int, n_features: int,
+                 scale: float, offset: float, missing_left: Optional[np.ndarray] = None):
+        self.feature = np.ascontiguousarray(feature, dtype=np.int32)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        # children[2 * i] : enfant gauche (x <= seuil), children[2 * i + 1] : enfant droit
+        self.children = np.ascontiguousarray(children, dtype=np.int32)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+        self.scale = float(scale)
+        self.offset = float(offset)
+        # Côté des NaN à chaque nœud (None : valeurs manquantes refusées)
+        self.missing_left = None if missing_left is None else np.ascontiguousarray(missing_left, dtype=bool)
+        self.heap = self._build_heap() if self.max_depth <= MAX_HEAP_DEPTH else None
+
+    def _build_heap(self) -> Dict[str, np.ndarray]:
+        """
+        Disposition en arbres parfaits, construite niveau par niveau depuis les tableaux
+        explicites : une feuille atteinte trop tôt est recopiée dans tout son sous-arbre
+        (elle est son propre enfant), son seuil n'a donc aucune importance.
+        """
+        depth = self.max_depth
+        n_internal = 2 ** depth - 1
+        nodes = self.roots.astype(np.intp)[:, None]
+        records = np.empty((self.n_trees, n_internal), dtype=NODE_DTYPE)
+        for level in range(depth):
+            first = 2 ** level - 1
+            records["threshold"][:, first:2 * first + 1] = _float32_floor(self.threshold[nodes])
+            records["feature"][:, first:2 * first + 1] = self.feature[nodes]
+            nodes = self.children[np.stack([2 * nodes, 2 * nodes + 1], axis=2)].reshape(self.n_trees, -1)
+        return {
+            "records": records.ravel(),
+            "leaves": self.value[nodes].ravel(),
+            "tree_offsets": (np.arange(self.n_trees) * n_internal).astype(np.intp),
+            "leaf_offsets": (np.arange(self.n_trees) * (n_internal + 1) - n_internal).astype(np.intp),
+        }
+
+    @classmethod
+    def from_sklearn(cls, model) -> 'CompiledForest':
+        """Aplatit un RandomForestRegressor ou GradientBoostingRegressor entraîné"""
+        n_features = model.n_features_in_
+        if hasattr(model, "learning_rate") and hasattr(model, "init_"):
+            # Gradient Boosting : init + learning_rate * somme des arbres
+            estimators = np.asarray(model.estimators_).ravel()
+            scale = model.learning_rate
+            # sklearn refuse les NaN pour le Gradient Boosting
+            accepts_missing = False
+            if isinstance(model.init_, str):
+                offset = 0.0
+            else:
+                offset = float(np.ravel(model.init_.predict(np.zeros((1, n_features))))[0])
+        elif hasattr(model, "estimators_"):
+            # Random Forest : moyenne des arbres
+            estimators = model.estimators_
+            scale = 1.0 / len(estimators)
+            offset = 0.0
+            accepts_missing = True
+        else:
+            raise ValueError("Le modèle doit être une forêt d'arbres (RandomForest ou GradientBoosting)")
+
+        features, thresholds, children, values, roots, missing = [], [], [], [], [], []
+        start, max_depth = 0, 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+            # Une feuille pointe sur elle-même des deux côtés
+            left = np.where(is_leaf, nodes, tree.children_left) + start
+            right = np.where(is_leaf, nodes, tree.children_right) + start
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            children.append(np.stack([left, right], axis=1).ravel())
+            values.append(tree.value[:, 0, 0])
+            missing.append(tree.missing_go_to_left.astype(bool))
+            roots.append(start)
+            start += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(np.concatenate(features), np.concatenate(thresholds), np.concatenate(children),
+                   np.concatenate(values), np.array(roots), max_depth, n_features, scale, offset,
+                   np.concatenate(missing) if accepts_missing else None)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def predict(self, X, chunk_size: int = 256) -> np.ndarray:
+        """
+        Prédictions pour X (n_lignes, n_features), identiques à sklearn aux arrondis près,
+        NaN compris. ValueError si X contient des NaN que la forêt ne sait pas router.
+        """
+        # sklearn compare des features float32 aux seuils float64
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        has_missing = bool(np.isnan(X).any())
+        if has_missing and self.missing_left is None:
+            raise ValueError("Valeurs manquantes (NaN) non acceptées par ce modèle")
+        out = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), chunk_size):
+            out[start:start + chunk_size] = self._predict_chunk(X[start:start + chunk_size], has_missing)
+        return out
+
+    def _predict_chunk(self, X: np.ndarray, has_missing: bool = False) -> np.ndarray:
+        flat = X.ravel()
+        base = (np.arange(len(X), dtype=np.intp) * self.n_features)[:, None]
+        if self.heap is not None and not has_missing:
+            return self._predict_heap(flat, base)
+        nodes = np.broadcast_to(self.roots, (len(X), self.n_trees))
+        for _ in range(self.max_depth):
+            x = flat[base + self.feature[nodes]]
+            go_right = x > self.threshold[nodes]
+            if has_missing:
+                # NaN > seuil est faux : le côté appris par sklearn est appliqué explicitement
+                go_right |= np.isnan(x) & ~self.missing_left[nodes]
+            nodes = self.children[2 * nodes + go_right]
+        return self.offset + self.scale * self.value[nodes].sum(axis=1)
+
+    def _predict_heap(self, flat: np.ndarray, base: np.ndarray) -> np.ndarray:
+        heap = self.heap
+        local = np.zeros((len(base), self.n_trees), dtype=np.intp)
+        for _ in range(self.max_depth):
+            nodes = heap["records"][heap["tree_offsets"] + local]
+            go_right = flat[base + nodes["feature"]] > nodes["threshold"]
+            local = 2 * local + 1 + go_right
+        return self.offset + self.scale * heap["leaves"][heap["leaf_offsets"] + local].sum(axis=1)
+
+    def to_dict(self) -> Dict:
+        """Tableaux et paramètres (sérialisables sans dépendance à cette classe)"""
+        params = {name: getattr(self, name) for name in self.ARRAYS}
+        if self.missing_left is not None:
+            params["missing_left"] = self.missing_left
+        params.update(max_depth=self.max_depth, n_features=self.n_features,
+                      scale=self.scale, offset=self.offset)
+        return params
+
+    def save(self, path: str):
+        """Sauvegarde en .npz (écriture atomique)"""
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, **self.to_dict())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'CompiledForest':
+        with np.load(path) as data:
+            return cls(**{name: data[name] for name in data.files})
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Ingestion par morceaux des CSV de matchs.
+
+Les fichiers de matchs (game, game_summary, ...) sont lus par blocs de lignes,
+limités aux colonnes utiles avec des types compacts (catégories, int32,
+float32). Chaque bloc est réduit tout de suite en compteurs par (saison, équipe)
+— matchs, matchs à domicile, victoires, défaites, points — additionnés à un
+total : la mémoire dépend du nombre d'équipes-saisons, pas de la taille du
+fichier, et aucune copie domicile / extérieur de la table n'est construite.
+
+Exemple :
+    python game_ingest.py --dataset games --output team_game_stats.csv
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .data_registry import get_registry
+except ImportError:
+    from data_registry import get_registry
+
+# Colonnes utiles par format de fichier ; result : colonne W/L du match côté domicile / extérieur
+LAYOUTS = {
+    # game.csv (base NBA) : une ligne par match, résultat et points des deux équipes
+    'game': {
+        'season': 'season_id', 'season_dtype': np.int32,
+        'home': 'team_abbreviation_home', 'away': 'team_abbreviation_away',
+        'home_result': 'wl_home', 'away_result': 'wl_away',
+        'home_pts': 'pts_home', 'away_pts': 'pts_away',
+        'team': 'team_abbreviation',
+    },
+    # game_summary.csv : équipes (identifiants) sans résultat
+    'game_summary': {
+        'season': 'season', 'season_dtype': 'category',
+        'home': 'home_team_id', 'away': 'visitor_team_id',
+        'team': 'team_id',
+    },
+}
+# Format de chaque jeu du registre
+DATASET_LAYOUTS = {'games': 'game', 'game_summary': 'game_summary'}
+
+COUNT_COLUMNS = ['games', 'home_games', 'wins', 'losses', 'points', 'scored_games']
+
+
+def season_years(values: pd.Series) -> np.ndarray:
+    """Année de début de saison : 22022 (season_id) ou 2022 -> 2022, "2022-23" -> 2022"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Conversion des seules catégories, puis lecture par code
+        return season_years(pd.Series(values.cat.categories))[values.cat.codes.to_numpy()]
+    if pd.api.types.is_numeric_dtype(values):
+        return (values.to_numpy(dtype=np.int64) % 10000).astype(np.int16)
+    return values.astype(str).str[:4].astype(np.int16).to_numpy()
+
+
+class GameAccumulator:
+    """Compteurs par (saison, équipe) additionnés bloc après bloc"""
+    def __init__(self, layout: str = 'game'):
+        if layout not in LAYOUTS:
+            raise ValueError(f"Format inconnu : {layout} (disponibles : {sorted(LAYOUTS)})")
+        self.layout = LAYOUTS[layout]
+        self.totals: Optional[pd.DataFrame] = None
+        self.rows = 0
+
+    def columns(self) -> Dict[str, str]:
+        """Colonnes à lire et leur type compact"""
+        dtypes = {self.layout['season']: self.layout['season_dtype']}
+        for side in ('home', 'away'):
+            dtypes[self.layout[side]] = 'category'
+            if f'{side}_result' in self.layout:
+                dtypes[self.layout[f'{side}_result']] = 'category'
+            if f'{side}_pts' in self.layout:
+                dtypes[self.layout[f'{side}_pts']] = np.float32
+        return dtypes
+
+    def add(self, chunk: pd.DataFrame):
+        """Réduit un bloc de matchs et l'ajoute au total"""
+        seasons = season_years(chunk[self.layout['season']])
+        for side in ('home', 'away'):
+            teams = chunk[self.layout[side]]
+            counts = pd.DataFrame({
+                'season_year': seasons,
+                'team': teams,
+                'games': np.ones(len(chunk), dtype=np.int32),
+                'home_games': np.full(len(chunk), side == 'home', dtype=np.int32),
+            })
+            result_col = self.layout.get(f'{side}_result')
+            if result_col is not None:
+                result = chunk[result_col]
+                counts['wins'] = (result == 'W').to_numpy(dtype=np.int32)
+                counts['losses'] = (result == 'L').to_numpy(dtype=np.int32)
+            pts_col = self.layout.get(f'{side}_pts')
+            if pts_col is not None:
+                points = chunk[pts_col].to_numpy(dtype=np.float64)
+                counts['points'] = np.nan_to_num(points)
+                counts['scored_games'] = (~np.isnan(points)).astype(np.int32)
+
+            reduced = counts.groupby(['season_year', 'team'], observed=True).sum()
+            # Catégories propres à chaque bloc : l'index total est en valeurs simples
+            reduced.index = pd.MultiIndex.from_arrays(
+                [reduced.index.get_level_values(0), reduced.index.get_level_values(1).astype(object)],
+                names=['season_year', 'team'],
+            )
+            self.totals = reduced if self.totals is None else self.totals.add(reduced, fill_value=0)
+        self.rows += len(chunk)
+
+    def result(self) -> pd.DataFrame:
+        """Une ligne par (saison, équipe) avec compteurs, win_rate et points par match"""
+        if self.totals is None:
+            return pd.DataFrame(columns=['season_year', 'season', self.layout['team']] + COUNT_COLUMNS)
+        stats = self.totals.reset_index()
+        # Identifiants d'équipe lus en catégories : retour aux entiers avant le tri
+        team = pd.to_numeric(stats['team'], errors='coerce')
+        if team.notna().all():
+            stats['team'] = team.astype(np.int64)
+        stats = stats.sort_values(['season_year', 'team'], kind='stable', ignore_index=True)
+        for col in COUNT_COLUMNS:
+            if col in stats.columns:
+                stats[col] = stats[col].astype(np.float64 if col == 'points' else np.int32)
+        if 'wins' in stats.columns:
+            decided = stats['wins'] + stats['losses']
+            stats['win_rate'] = stats['wins'] / decided.where(decided > 0)
+        if 'points' in stats.columns:
+            stats['pts_per_game'] = stats['points'] / stats['scored_games'].where(stats['scored_games'] > 0)
+        stats.insert(1, 'season', [f"{year}-{str(year + 1)[-2:]}" for year in stats['season_year']])
+        return stats.rename(columns={'team': self.layout['team']})
+
+
+def ingest_games(path: str, layout: str = 'game', sep: str = ',', chunksize: int = 100_000) -> pd.DataFrame:
+    """Statistiques par (saison, équipe) d'un CSV de matchs lu par blocs de `chunksize` lignes"""
+    accumulator = GameAccumulator(layout)
+    dtypes = accumulator.columns()
+    reader = pd.read_csv(path, sep=sep, usecols=list(dtypes), dtype=dtypes, chunksize=chunksize)
+    with reader:
+        for chunk in reader:
+            accumulator.add(chunk)
+    return accumulator.result()
+
+
+def ingest_dataset(name: str, chunksize: int = 100_000) -> pd.DataFrame:
+    """ingest_games sur un jeu du registre (games ou game_summary)"""
+    registry = get_registry()
+    return ingest_games(registry.path(name), DATASET_LAYOUTS[name],
+                        sep=registry.spec(name).get('sep', ','), chunksize=chunksize)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Statistiques par équipe et saison depuis les CSV de matchs")
+    parser.add_argument("--dataset", default="games", choices=sorted(DATASET_LAYOUTS))
+    parser.add_argument("--path", default=None, help="CSV à lire à la place du fichier du registre")
+    parser.add_argument("--layout", default=None, choices=sorted(LAYOUTS),
+                        help="format du CSV --path (défaut : celui du jeu)")
+    parser.add_argument("--sep", default=",")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--output", default=None, help="CSV des statistiques par équipe et saison")
+    args = parser.parse_args()
+
+    start = time.time()
+    tracemalloc.start()
+    if args.path is None:
+        stats = ingest_dataset(args.dataset, chunksize=args.chunksize)
+    else:
+        stats = ingest_games(args.path, args.layout or DATASET_LAYOUTS[args.dataset],
+                             sep=args.sep, chunksize=args.chunksize)
+    peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    print(f"{len(stats)} équipes-saisons en {time.time() - start:.1f}s (pic d'allocations {peak_mb:.0f} Mo)")
+    if args.output:
+        stats.to_csv(args.output, index=False)
+        print(f"Statistiques sauvegardées dans {args.output}")
+    else:
+        print(stats.head(10).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Mise à jour incrémentale à l'arrivée d'une nouvelle saison.
+
+Au lieu de relancer l'entraînement complet (LineupPredictor.load_data) puis le
+pipeline de toutes les saisons, seules les lignes de la saison sont lues et
+préparées :
+    - la table agrégée top 5 de l'artefact reçoit les équipes de la saison ;
+    - la forêt du predictor est complétée par warm start (nouveaux arbres) ;
+    - la table agrégée sauvegardée par le pipeline (AGGREGATES_FILE) reçoit elle aussi
+      les seules équipes de la saison ;
+    - la Dream Team de la saison est recalculée comme dans le pipeline (cette table,
+      hyperparamètres du cache de réglage s'il en a pour ce jeu d'entraînement) et
+      remplace la sienne dans le CSV, les autres saisons ne sont pas touchées.
+Sans table du pipeline sauvegardée, elle est calculée une fois sur le jeu 'players'
+du registre.
+L'artefact enregistre la mise à jour (clé de modèle nouvelle : caches de scores et
+matrice des confrontations sont invalidés). Il reste valide pour les CSV sources
+actuels si la saison vient du registre ; avec --data, le prochain chargement
+complet réentraîne le modèle.
+
+Exemple :
+    python incremental_update.py --season 2024-25                       # saison lue dans df_v1.csv
+    python incremental_update.py --season 2024-25 --data saison_2024.csv --sep ,
+"""
+
+import argparse
+import os
+import time
+from typing import Optional
+
+import pandas as pd
+
+from data_cache import read_table
+from data_registry import get_registry, load_dataset
+from dream_team_pipeline import (AGGREGATES_FILE, FEATURES_ALL, MODELS, add_features, evaluate_model,
+                                 model_output)
+from dream_team_search import DreamTeamSearch, get_primary_pos
+from lineup_predictor import LineupPredictor, TeamAggregateStore
+from tuning import RESOURCES, TuningCache, fingerprint, make_estimator
+
+
+def season_dream_team(store: TeamAggregateStore, rows: pd.DataFrame, season: str, key: str,
+                      top_net: int = 10, center_net: int = 5, tuning: Optional[TuningCache] = None,
+                      resource: str = "n_estimators", top_k: int = 1, max_shared: Optional[int] = None):
+    """
+    Dream Team de la saison comme dans le pipeline : modèle entraîné sur les autres
+    saisons de `store` (table agrégée du pipeline, saison comprise), avec les hyperparamètres réglés de ce jeu d'entraînement s'ils sont dans
+    `tuning`, puis recherche sur les joueurs de la saison (top_k / max_shared comme
+    les options du pipeline). Les lignes ont toujours une colonne `rank`.
+    """
+    name, factory = MODELS[key]
+    X, y = store.training_set(FEATURES_ALL, exclude=season)
+    entry = tuning.get(fingerprint(X, y, key, resource)) if tuning is not None else None
+    model = make_estimator(key, **entry["params"]) if entry is not None else factory()
+    test_df = store.fold(season)[1]
+    model.fit(X.to_numpy(), y.to_numpy())
+    scores = evaluate_model(model, test_df[FEATURES_ALL].to_numpy(), test_df["win_rate"].to_numpy())
+
+    df_season = add_features(rows.copy())
+    df_season["primary_pos"] = df_season["position"].apply(get_primary_pos)
+    search = DreamTeamSearch(model, FEATURES_ALL, top_net=top_net, center_net=center_net)
+    if top_k > 1 or max_shared is not None:
+        dream = search.top_k(df_season, k=top_k, season=season, max_shared=max_shared)
+    else:
+        dream = search.search(df_season, season=season)
+        dream["rank"] = 1
+    dream = dream.rename(columns={"player": "player_name"})
+    dream["model"] = name
+    return dream, {f"{key}_rmse": scores["rmse"], f"{key}_r2": scores["r2"]}
+
+
+def existing_top_k(path: str) -> int:
+    """Lineups par saison du CSV des Dream Teams existant (1 sans colonne rank)"""
+    if not os.path.exists(path):
+        return 1
+    ranks = pd.read_csv(path, sep=";", usecols=lambda col: col == "rank")
+    if "rank" not in ranks.columns or ranks["rank"].isna().all():
+        return 1
+    return int(ranks["rank"].max())
+
+
+def replace_season(path: str, season: str, rows: pd.DataFrame, sep: str):
+    """Remplace les lignes de la saison dans le CSV `path` (créé s'il n'existe pas)"""
+    if os.path.exists(path):
+        table = pd.read_csv(path, sep=sep)
+        table = table[table["season"].astype(str) != season]
+        rows = pd.concat([table, rows], ignore_index=True)
+    rows = rows.sort_values("season", kind="stable")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    rows.to_csv(tmp_path, sep=sep, index=False)
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ajout incrémental d'une saison au modèle et aux Dream Teams")
+    parser.add_argument("--season", required=True, help="saison à ajouter, ex. 2024-25")
+    parser.add_argument("--data", default=None,
+                        help="CSV contenant la saison (défaut : jeu 'players' du registre)")
+    parser.add_argument("--sep", default=",", help="séparateur du CSV --data")
+    parser.add_argument("--trees", type=int, default=50, help="arbres ajoutés à la forêt du predictor")
+    parser.add_argument("--artifact", default=None, help="artefact du predictor (défaut : lineup_predictor.pkl)")
+    parser.add_argument("--models", nargs="+", default=["rf"], choices=sorted(MODELS))
+    parser.add_argument("--top-net", type=int, default=10)
+    parser.add_argument("--center-net", type=int, default=5)
+    parser.add_argument("--top-k", type=int, default=None,
+                        help="lineups par saison (défaut : celui du CSV existant, 1 sans colonne rank)")
+    parser.add_argument("--max-shared", type=int, default=None,
+                        help="joueurs communs max entre deux lineups d'une même saison")
+    parser.add_argument("--output", default=None,
+                        help="CSV des Dream Teams (défaut : jeu 'dream_teams' du registre)")
+    parser.add_argument("--metrics", default=None, help="CSV des métriques du pipeline à mettre à jour")
+    parser.add_argument("--tune-cache", default="tuning_cache.json",
+                        help="cache de réglage du pipeline (paramètres appliqués s'ils existent)")
+    parser.add_argument("--tune-resource", default="n_estimators", choices=RESOURCES)
+    parser.add_argument("--aggregates", default=None,
+                        help=f"table agrégée du pipeline (défaut : {AGGREGATES_FILE} du registre)")
+    args = parser.parse_args()
+
+    registry = get_registry()
+    artifact_path = args.artifact or registry.file("lineup_predictor.pkl")
+    start = time.time()
+
+    # 1. Artefact existant, même s'il a été construit avant l'arrivée de la saison
+    predictor = LineupPredictor.load(artifact_path, check_key=False)
+    if predictor is None:
+        raise SystemExit(f"Aucun artefact utilisable dans {artifact_path} : lancer d'abord un entraînement complet")
+
+    # 2. Lignes de la saison uniquement
+    players = load_dataset("players") if args.data is None else read_table(args.data, sep=args.sep)
+    rows = players[players["season"].astype(str) == args.season].reset_index(drop=True)
+    del players
+    if rows.empty:
+        raise SystemExit(f"Aucune ligne pour la saison {args.season}")
+
+    # 3. Warm start du predictor et sauvegarde de l'artefact
+    record = predictor.update_season(rows, extra_trees=args.trees, from_registry=args.data is None)
+    predictor.save(artifact_path)
+    print(f"Predictor : {record['rows']} joueurs ajoutés, {record['n_trees']} arbres "
+          f"({time.time() - start:.1f}s)")
+
+    # 4. Table agrégée du pipeline : ajout des équipes de la saison
+    aggregates_path = args.aggregates or registry.file(AGGREGATES_FILE)
+    store = TeamAggregateStore.load(aggregates_path)
+    if store is None:
+        print(f"Pas de table agrégée dans {aggregates_path} : calcul sur le jeu 'players' du registre")
+        store = TeamAggregateStore().build(add_features(load_dataset("players")), FEATURES_ALL)
+    store.append(add_features(rows.copy()))
+    store.save(aggregates_path)
+
+    # 5. Dream Team de la saison seulement
+    tuning = TuningCache(args.tune_cache)
+    metrics = {"season": args.season}
+    output = args.output or registry.path("dream_teams")
+    for key in args.models:
+        model_start = time.time()
+        path = model_output(output, key, args.models)
+        top_k = args.top_k if args.top_k is not None else existing_top_k(path)
+        dream, scores = season_dream_team(store, rows, args.season, key, args.top_net, args.center_net,
+                                          tuning, args.tune_resource, top_k, args.max_shared)
+        metrics.update(scores)
+        metrics[f"{key}_time"] = time.time() - model_start
+        replace_season(path, args.season, dream, sep=";")
+        print(f"Dream Team {args.season} ({MODELS[key][0]}) mise à jour dans {path}")
+    if args.metrics:
+        replace_season(args.metrics, args.season, pd.DataFrame([metrics]), sep=",")
+
+    print(f"Saison {args.season} ajoutée en {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
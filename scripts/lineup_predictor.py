@@ -1,31 +1,203 @@
 import pandas as pd
 import numpy as np
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 import random
+import hashlib
+import json
+import os
+import pickle
 from datetime import datetime
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
+
+try:
+    from .data_registry import get_registry
+    from .forest_inference import COMPILED_MAX_BATCH, CompiledForest
+    from .game_ingest import ingest_dataset
+    from .player_store import Lineup, PlayerSearchIndex, PlayerStore, POSITION_LABELS, classify_positions
+    from .score_cache import LRUCache
+except ImportError:
+    from data_registry import get_registry
+    from forest_inference import COMPILED_MAX_BATCH, CompiledForest
+    from game_ingest import ingest_dataset
+    from player_store import Lineup, PlayerSearchIndex, PlayerStore, POSITION_LABELS, classify_positions
+    from score_cache import LRUCache
+
+def top_n_per_group(df: pd.DataFrame, by: List[str], column: str, n: int = 5) -> pd.DataFrame:
+    """
+    Les n lignes de plus grande valeur de `column` dans chaque groupe `by`.
+    Équivalent de groupby(by).apply(lambda x: x.nlargest(n, column)) avec un seul
+    tri vectorisé + cumcount (ex-aequo départagés par ordre d'apparition, comme nlargest).
+    """
+    df = df[df[column].notna()]
+    codes = [pd.factorize(df[col], sort=True)[0] for col in by]
+    # np.lexsort trie sur la dernière clé en premier et reste stable
+    order = np.lexsort([-df[column].to_numpy(dtype=np.float64)] + codes[::-1])
+    ranked = df.iloc[order]
+    return ranked[ranked.groupby(by, sort=False, observed=True).cumcount().to_numpy() < n]
+
+
+class TeamAggregateStore:
+    """
+    Moyennes des features du top 5 (points) de chaque équipe par saison, avec le
+    win_rate de l'équipe. La table est calculée une seule fois ; les jeux
+    d'entraînement "toutes les saisons sauf une" sont obtenus par simple masque.
+    """
+    def __init__(self, keys: Tuple[str, str] = ('season', 'team_abbreviation'),
+                 rank_by: str = 'pts', top_n: int = 5):
+        self.keys = list(keys)
+        self.rank_by = rank_by
+        self.top_n = top_n
+        self.features = None
+        self.table = None
+
+    def build(self, df: pd.DataFrame, features: List[str]) -> 'TeamAggregateStore':
+        """Calcule la table agrégée à partir de la table des joueurs"""
+        top_players = top_n_per_group(df, self.keys, self.rank_by, self.top_n)
+        agg = top_players.groupby(self.keys, observed=True)[features].mean().reset_index()
+
+        team_wr = df[self.keys + ['win_rate']].drop_duplicates()
+        self.table = pd.merge(agg, team_wr, on=self.keys, how='left')
+        self.features = list(features)
+        return self
+
+    def append(self, df: pd.DataFrame) -> 'TeamAggregateStore':
+        """
+        Ajoute (ou remplace) les saisons présentes dans `df` sans recalculer les
+        autres : seules les nouvelles lignes sont agrégées.
+        """
+        new = TeamAggregateStore(self.keys, self.rank_by, self.top_n).build(df, self.features)
+        kept = ~self.table[self.keys[0]].isin(new.table[self.keys[0]].unique()).to_numpy()
+        table = pd.concat([self.table[kept], new.table], ignore_index=True)
+        # Même ordre que build (groupes triés) : jeux d'entraînement identiques à un calcul complet
+        self.table = table.sort_values(self.keys, kind='stable', ignore_index=True)
+        return self
+
+    def save(self, path: str):
+        """Sauvegarde la table (attributs seuls, écriture atomique)"""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(vars(self), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['TeamAggregateStore']:
+        """Table sauvegardée par save ; None si absente ou illisible"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                attributes = pickle.load(f)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+        store = cls()
+        store.__dict__.update(attributes)
+        return store
+
+    def fold(self, season) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Retourne (entraînement sans la saison, test sur la saison)"""
+        in_season = (self.table[self.keys[0]] == season).to_numpy()
+        return self.table[~in_season], self.table[in_season]
+
+    def training_set(self, features: List[str] = None, exclude=None) -> Tuple[pd.DataFrame, pd.Series]:
+        """Matrice X / cible y, éventuellement sans une saison"""
+        features = features or self.features
+        table = self.table if exclude is None else self.fold(exclude)[0]
+        return table[features], table['win_rate']
+
+
+# Jeux de données sources du predictor (noms du registre data_registry)
+SOURCE_DATASETS = ('players', 'draft_combine', 'game_summary')
+
+# À incrémenter quand le contenu de l'artefact sauvegardé change de format
+# (4 : côté des valeurs manquantes dans la forêt compilée)
+ARTIFACT_VERSION = 4
+
 
 class LineupPredictor:
-    def __init__(self):
+    # (bonus, description) par composition de lineup, calculés une seule fois
+    _coherence_lookup = None
+
+    # Au-delà, un lot (simulation, matrice...) est noté sans passer par le cache
+    SCORE_CACHE_MAX_BATCH = 256
+
+    def __init__(self, n_estimators: int = 200, max_depth: int = 10, random_state: int = 42,
+                 score_cache_size: int = 4096, use_compiled: bool = True):
+        self.n_estimators = n_estimators
+        self.max_depth = max_depth
+        self.random_state = random_state
+        self.artifact_key = None
+        self.source_key = None
+        self.fill_values = {}
         self.players_data = None
         self.draft_combine_data = None
         self.game_data = None
+        # Matchs joués par (saison, équipe), agrégés par lecture en blocs du CSV des matchs
+        self.game_stats = None
         self.team_stats = None
-        self.model = None
+        # Modèle sklearn désérialisé à la demande ; les petits lots passent par la forêt compilée
+        self._model = None
+        self._model_bytes = None
+        self.compiled = None
+        self.use_compiled = use_compiled
         self.features = None
-        self.scaler = StandardScaler()
-        
-    def load_data(self):
-        """Charge et prépare les données nécessaires"""
+        self.team_aggregates = None
+        # Mises à jour incrémentales appliquées depuis le dernier entraînement complet
+        self.increments = []
+        self.store = None
+        self._search_index = None
+        # Scores des lineups de self.store, clé : (identifiants triés, version du modèle)
+        self.score_cache = LRUCache(score_cache_size) if score_cache_size > 0 else None
+        self._scaler = None
+
+    @property
+    def model(self):
+        """Modèle sklearn (import de sklearn seulement s'il est réellement utilisé)"""
+        if self._model is None and self._model_bytes is not None:
+            self._model = pickle.loads(self._model_bytes)
+        return self._model
+
+    @model.setter
+    def model(self, model):
+        self._model = model
+        self._model_bytes = None
+        self.compiled = CompiledForest.from_sklearn(model) if model is not None else None
+
+    @property
+    def search_index(self) -> PlayerSearchIndex:
+        """Recherche par préfixe des joueurs-saisons de self.store (reconstruite si le store change)"""
+        if self._search_index is None or self._search_index.store is not self.store:
+            self._search_index = PlayerSearchIndex(self.store)
+        return self._search_index
+
+    @property
+    def scaler(self):
+        if self._scaler is None:
+            from sklearn.preprocessing import StandardScaler
+            self._scaler = StandardScaler()
+        return self._scaler
+
+    def load_data(self, artifact_path: Optional[str] = None):
+        """
+        Charge et prépare les données nécessaires.
+        Si artifact_path est fourni, l'artefact sauvegardé est réutilisé tant que les
+        CSV sources et les paramètres d'entraînement n'ont pas changé ; sinon le
+        modèle est réentraîné puis l'artefact est réécrit.
+        """
+        self.artifact_key = self.source_key = self.compute_artifact_key()
+        if self.score_cache is not None:
+            self.score_cache.clear()
+        if artifact_path is not None and self._restore(artifact_path):
+            return
+
+        registry = get_registry()
         # Charger les données des joueurs
-        self.players_data = pd.read_csv('/Users/spira/Desktop/Cours Albert B2/Data/NBA/Data final/df_v1.csv',sep=';')
+        # (cache colonnaire : noms et équipes en category)
+        self.players_data = registry.load('players')
         
         # Charger les données du draft combine (uniquement pour l'affichage)
-        self.draft_combine_data = pd.read_csv('/Users/spira/Desktop/Cours Albert B2/Data/NBA/Data final/df_draft_combine_cleaned.csv')
+        self.draft_combine_data = registry.load('draft_combine')
         
-        # Charger les données des matchs
-        self.game_data = pd.read_csv('/Users/spira/Desktop/Cours Albert B2/Data/NBA/Data final/df_game_summary_cleaned.csv')
+        # Matchs : lecture en blocs réduite aux compteurs par (saison, équipe)
+        self.game_stats = ingest_dataset('game_summary')
         
         # Convertir les saisons au même format et filtrer après 2000
         self.players_data['season_year'] = self.players_data['season'].str[:4].astype(int)
@@ -39,60 +211,130 @@ class LineupPredictor:
         
         # Entraîner le modèle
         self._train_model()
+        self.store = PlayerStore(self.players_data, self.features).attach_combine(self.draft_combine_data)
+
+        if artifact_path is not None:
+            self.save(artifact_path)
+
+    def compute_artifact_key(self) -> str:
+        """Empreinte du contenu des CSV sources et des paramètres d'entraînement"""
+        registry = get_registry()
+        digest = hashlib.sha256()
+        for name in SOURCE_DATASETS:
+            digest.update(name.encode())
+            with open(registry.path(name), 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+        params = {
+            'version': ARTIFACT_VERSION,
+            'n_estimators': self.n_estimators,
+            'max_depth': self.max_depth,
+            'random_state': self.random_state,
+        }
+        digest.update(json.dumps(params, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def save(self, path: str):
+        """Sauvegarde le modèle entraîné et les données préparées"""
+        artifact = {
+            'version': ARTIFACT_VERSION,
+            'key': self.artifact_key or self.compute_artifact_key(),
+            # Empreinte des sources pour laquelle l'artefact est à jour (= key sans mise à jour incrémentale)
+            'source_key': self.source_key or self.artifact_key or self.compute_artifact_key(),
+            'increments': self.increments,
+            # Modèle sklearn sérialisé à part : le charger n'importe pas sklearn
+            'model_bytes': self._model_bytes or pickle.dumps(self.model, protocol=pickle.HIGHEST_PROTOCOL),
+            'compiled': self.compiled.to_dict(),
+            'features': self.features,
+            'fill_values': self.fill_values,
+            'players_data': self.players_data,
+            'draft_combine_data': self.draft_combine_data,
+            'team_stats': self.team_stats,
+            'game_stats': self.game_stats,
+            # Attributs seuls : l'artefact ne dépend pas du chemin d'import (models.* ou scripts)
+            'team_aggregates': vars(self.team_aggregates),
+        }
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Écriture atomique : un worker concurrent ne lit jamais un fichier partiel
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, expected_key: Optional[str] = None,
+             check_key: bool = True) -> Optional['LineupPredictor']:
+        """
+        Charge un predictor sauvegardé ; None si absent, d'un autre format ou périmé
+        (check_key=False : accepte un artefact construit sur d'autres sources).
+        """
+        predictor = cls()
+        if expected_key is None and check_key:
+            expected_key = predictor.compute_artifact_key()
+        predictor.artifact_key = predictor.source_key = expected_key
+        return predictor if predictor._restore(path, check_key) else None
+
+    def _restore(self, path: str, check_key: bool = True) -> bool:
+        """Restaure l'état depuis l'artefact s'il correspond aux sources (self.source_key)"""
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, 'rb') as f:
+                artifact = pickle.load(f)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # Artefact illisible (autre version du code) : on réentraîne
+            return False
+        if artifact.get('version') != ARTIFACT_VERSION:
+            return False
+        if check_key and artifact.get('source_key', artifact.get('key')) != self.source_key:
+            return False
+
+        # Version du modèle (clé des caches de scores), différente des sources après une mise à jour
+        self.artifact_key = artifact['key']
+        self.source_key = artifact.get('source_key', artifact['key'])
+        self.increments = artifact.get('increments', [])
+
+        self._model = None
+        self._model_bytes = artifact['model_bytes']
+        self.compiled = CompiledForest(**artifact['compiled'])
+        self.features = artifact['features']
+        self.fill_values = artifact['fill_values']
+        self.players_data = artifact['players_data']
+        self.draft_combine_data = artifact['draft_combine_data']
+        self.team_stats = artifact['team_stats']
+        self.game_stats = artifact.get('game_stats')
+        self.team_aggregates = TeamAggregateStore()
+        self.team_aggregates.__dict__.update(artifact['team_aggregates'])
+        self.store = PlayerStore(self.players_data, self.features).attach_combine(self.draft_combine_data)
+        return True
+
+    @staticmethod
+    def _add_player_features(players: pd.DataFrame) -> pd.DataFrame:
+        """Feature engineering par joueur (modifie et retourne `players`)"""
+        players['pts_per_game'] = players['pts'] / players['gp']
+        players['reb_per_game'] = players['reb'] / players['gp']
+        players['ast_per_game'] = players['ast'] / players['gp']
+        players['ast_usg_ratio'] = players['ast_pct'] / (players['usg_pct'] + 1e-6)
+        players['reb_pct_sum'] = players['oreb_pct'] + players['dreb_pct']
         
+        # Ajouter des statistiques avancées
+        players['efficiency'] = (players['pts'] + players['reb'] + players['ast']) / players['gp']
+        players['scoring_efficiency'] = players['pts_per_game'] / (players['usg_pct'] + 1e-6)
+        players['playmaking'] = players['ast_per_game'] * players['ast_pct']
+        
+        # Gestion des positions : codes int8 (classification vectorisée), libellés G / F / C
+        position_codes = classify_positions(players['position'])
+        players['primary_pos'] = POSITION_LABELS[position_codes]
+        return players
+
     def _clean_and_prepare_data(self):
         """Nettoie et prépare les données des joueurs"""
         # Feature engineering pour les joueurs
-        self.players_data['pts_per_game'] = self.players_data['pts'] / self.players_data['gp']
-        self.players_data['reb_per_game'] = self.players_data['reb'] / self.players_data['gp']
-        self.players_data['ast_per_game'] = self.players_data['ast'] / self.players_data['gp']
-        self.players_data['ast_usg_ratio'] = self.players_data['ast_pct'] / (self.players_data['usg_pct'] + 1e-6)
-        self.players_data['reb_pct_sum'] = self.players_data['oreb_pct'] + self.players_data['dreb_pct']
+        self.players_data = self._add_player_features(self.players_data)
         
-        # Ajouter des statistiques avancées
-        self.players_data['efficiency'] = (self.players_data['pts'] + self.players_data['reb'] + self.players_data['ast']) / self.players_data['gp']
-        self.players_data['scoring_efficiency'] = self.players_data['pts_per_game'] / (self.players_data['usg_pct'] + 1e-6)
-        self.players_data['playmaking'] = self.players_data['ast_per_game'] * self.players_data['ast_pct']
-        
-        # Gestion des positions
-        def get_primary_pos(pos):
-            if pd.isna(pos):
-                return np.nan
-            pos = str(pos).upper()
-            if "GUARD" in pos and "CENTER" not in pos:
-                return "G"
-            if "CENTER" in pos:
-                return "C"
-            if "FORWARD" in pos:
-                return "F"
-            return np.nan
-        
-        self.players_data['primary_pos'] = self.players_data['position'].apply(get_primary_pos)
-        
-        # Préparer les données des matchs
-        if self.game_data is not None:
-            # Créer deux dataframes séparés pour les équipes à domicile et à l'extérieur
-            home_games = self.game_data.copy()
-            visitor_games = self.game_data.copy()
-            
-            # Renommer les colonnes pour la fusion
-            home_games = home_games.rename(columns={'home_team_id': 'team_id'})
-            visitor_games = visitor_games.rename(columns={'visitor_team_id': 'team_id'})
-            
-            # Combiner les deux dataframes
-            all_games = pd.concat([home_games, visitor_games], ignore_index=True)
-            
-            # Calculer les statistiques moyennes par équipe et par saison
-            game_stats = all_games.groupby(['season', 'team_id']).agg({
-                'game_id': 'count'  # Nombre de matchs joués
-            }).reset_index()
-            
-            # Renommer la colonne de compte
-            game_stats = game_stats.rename(columns={'game_id': 'games_played'})
-            
-            # Fusionner avec les données des joueurs
-            # Note: Nous devons d'abord nous assurer que team_id correspond à team_abbreviation
-            # Pour l'instant, nous allons simplement ajouter les statistiques de base
+        # Statistiques de matchs par équipe (self.game_stats, identifiants d'équipe) :
+        # team_id ne correspond pas encore à team_abbreviation, on garde les stats de base
+        if self.game_stats is not None:
             self.players_data['games_played'] = self.players_data['gp']
         
         # Remplacer les valeurs manquantes
@@ -105,12 +347,13 @@ class LineupPredictor:
         
         for col in numeric_columns:
             if col in self.players_data.columns:
-                self.players_data[col] = self.players_data[col].fillna(self.players_data[col].mean())
+                self.fill_values[col] = self.players_data[col].mean()
+                self.players_data[col] = self.players_data[col].fillna(self.fill_values[col])
         
     def _calculate_team_stats(self):
         """Calcule les statistiques d'équipe"""
         # Statistiques de base
-        self.team_stats = self.players_data.groupby('team_abbreviation').agg({
+        self.team_stats = self.players_data.groupby('team_abbreviation', observed=True).agg({
             'win_rate': 'mean',
             'pts_per_game': 'mean',
             'reb_per_game': 'mean',
@@ -141,32 +384,93 @@ class LineupPredictor:
         # Sélectionner les 8 meilleures features
         self.features = corr_win.index.tolist()[:8]
         
-        # Préparer les données d'entraînement
-        train_data = self.players_data.groupby(['season_year', 'team_abbreviation']).apply(
-            lambda x: x.nlargest(5, 'pts')
-        ).reset_index(drop=True)
-        
-        # Agréger les statistiques par équipe
-        team_stats = train_data.groupby(['season_year', 'team_abbreviation'])[self.features].mean().reset_index()
-        
-        # Fusionner avec le winrate
-        team_stats = pd.merge(
-            team_stats,
-            self.players_data[['season_year', 'team_abbreviation', 'win_rate']].drop_duplicates(),
-            on=['season_year', 'team_abbreviation']
-        )
+        # Préparer les données d'entraînement : top 5 de chaque équipe, agrégé une seule
+        # fois pour toutes les features candidates
+        if self.team_aggregates is None:
+            self.team_aggregates = TeamAggregateStore(keys=('season_year', 'team_abbreviation')).build(
+                self.players_data, features_all
+            )
         
         # Entraîner le modèle
-        X = team_stats[self.features]
-        y = team_stats['win_rate']
+        X, y = self.team_aggregates.training_set(self.features)
         
-        self.model = RandomForestRegressor(n_estimators=200, random_state=42, max_depth=10)
-        self.model.fit(X, y)
+        from sklearn.ensemble import RandomForestRegressor
+        model = RandomForestRegressor(
+            n_estimators=self.n_estimators, random_state=self.random_state, max_depth=self.max_depth
+        )
+        model.fit(X, y)
+        # Compilation de la forêt en tableaux NumPy pour l'inférence
+        self.model = model
+
+    def update_season(self, season_rows: pd.DataFrame, extra_trees: int = 50,
+                      from_registry: bool = False) -> Dict:
+        """
+        Mise à jour incrémentale avec les lignes d'une nouvelle saison (format du jeu
+        'players') : seules ces lignes sont préparées puis agrégées, et la forêt reçoit
+        `extra_trees` arbres entraînés sur la table agrégée à jour (warm start). Les
+        arbres existants et les features sélectionnées ne changent pas. Une saison
+        déjà présente est remplacée.
+        from_registry : les lignes viennent des CSV du registre, l'artefact reste alors
+        valide pour ces sources. Sinon il ne correspond plus à aucune source et le
+        prochain load_data complet réentraîne.
+        """
+        rows = season_rows.copy()
+        rows['season_year'] = rows['season'].str[:4].astype(int)
+        rows = rows[rows['season_year'] >= 2000]
+        if rows.empty:
+            raise ValueError("Aucune ligne de saison postérieure à 2000 à ajouter")
+        rows = self._add_player_features(rows)
+        if 'games_played' in self.players_data.columns:
+            rows['games_played'] = rows['gp']
+        for col, value in self.fill_values.items():
+            if col in rows.columns:
+                rows[col] = rows[col].fillna(value)
+
+        seasons = sorted(int(year) for year in rows['season_year'].unique())
+        categorical = self.players_data.select_dtypes('category').columns
+        kept = ~self.players_data['season_year'].isin(seasons).to_numpy()
+        self.players_data = pd.concat([self.players_data[kept], rows], ignore_index=True)
+        for col in categorical:
+            self.players_data[col] = self.players_data[col].astype('category')
+
+        self.team_aggregates.append(rows)
+        self._calculate_team_stats()
+
+        # Warm start : RandomForest ajoute des arbres, GradientBoosting des étapes
+        X, y = self.team_aggregates.training_set(self.features)
+        model = self.model
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + extra_trees)
+        model.fit(X, y)
+        self.model = model
+        self.store = PlayerStore(self.players_data, self.features).attach_combine(self.draft_combine_data)
+
+        # Nouvelle version du modèle : les scores en cache (et la matrice des confrontations) sont périmés
+        record = {
+            'seasons': seasons,
+            'rows': len(rows),
+            'added_trees': extra_trees,
+            'n_trees': model.n_estimators,
+            'date': datetime.now().isoformat(timespec='seconds'),
+        }
+        digest = hashlib.sha256(json.dumps([self.artifact_key, record], sort_keys=True).encode())
+        digest.update(pd.util.hash_pandas_object(rows[self.features], index=False).to_numpy().tobytes())
+        self.artifact_key = record['key'] = digest.hexdigest()
+        # source_key None : save() enregistre la clé de la mise à jour, qu'aucune source ne reproduit
+        self.source_key = self.compute_artifact_key() if from_registry else None
+        self.increments = self.increments + [record]
+        if self.score_cache is not None:
+            self.score_cache.clear()
+        return record
         
     def get_lineup_coherence(self, lineup: List[Dict]) -> Tuple[float, str]:
         """Calcule la cohérence d'un lineup et retourne le bonus et la description"""
         # Ne considérer que les positions connues (non-NaN)
         positions = [player['position'] for player in lineup if pd.notna(player['position'])]
+        return self._coherence_from_positions(positions)
+
+    @staticmethod
+    def _coherence_from_positions(positions: List[str]) -> Tuple[float, str]:
+        """Bonus et description pour une liste de positions connues"""
         if not positions:  # Si aucune position n'est connue
             return 1.0, "Positions inconnues"
             
@@ -197,66 +501,36 @@ class LineupPredictor:
         
         return 1.0, "Lineup standard"
         
+    def random_lineup(self) -> Lineup:
+        """Tire 5 joueurs au hasard parmi les 100 plus efficaces"""
+        efficiency = self.players_data['efficiency'].reset_index(drop=True)
+        return Lineup(efficiency.nlargest(100).sample(n=5).index)
+
     def select_random_lineup(self) -> List[Dict]:
         """Sélectionne aléatoirement une lineup de 5 joueurs"""
-        # Sélectionner 5 joueurs au hasard parmi les meilleurs
-        top_players = self.players_data.nlargest(100, 'efficiency')
-        selected_players = top_players.sample(n=5)
-        
         lineup = []
-        for _, player in selected_players.iterrows():
-            stats = {
-                'pts_per_game': player['pts_per_game'],
-                'reb_per_game': player['reb_per_game'],
-                'ast_per_game': player['ast_per_game'],
-                'net_rating': player['net_rating'],
-                'oreb_pct': player['oreb_pct'],
-                'dreb_pct': player['dreb_pct'],
-                'usg_pct': player['usg_pct'],
-                'ts_pct': player['ts_pct'],
-                'ast_pct': player['ast_pct'],
-                'ast_usg_ratio': player['ast_usg_ratio'],
-                'reb_pct_sum': player['reb_pct_sum'],
-                'efficiency': player['efficiency'],
-                'scoring_efficiency': player['scoring_efficiency'],
-                'playmaking': player['playmaking']
-            }
+        for player_id in self.random_lineup():
+            player = self.store.player(player_id)
             
-            # Ajouter les données du draft combine si disponibles
-            combine_data = {}
-            if 'player_name' in self.draft_combine_data.columns:
-                player_combine = self.draft_combine_data[self.draft_combine_data['player_name'] == player['player_name']]
-                if not player_combine.empty:
-                    combine_data = {
-                        'height': player_combine['height_wo_shoes_cm'].iloc[0],
-                        'wingspan': player_combine['wingspan_cm'].iloc[0],
-                        'standing_reach': player_combine['standing_reach_cm'].iloc[0],
-                        'body_fat': player_combine['body_fat_pct'].iloc[0],
-                        'vertical_leap': player_combine['standing_vertical_leap'].iloc[0],
-                        'max_vertical': player_combine['max_vertical_leap'].iloc[0],
-                        'agility': player_combine['lane_agility_time'].iloc[0],
-                        'sprint': player_combine['three_quarter_sprint'].iloc[0]
-                    }
-            
-            lineup.append({
-                'player_id': player.get('person_id'),
-                'name': player['player_name'],
-                'position': player['primary_pos'],
-                'team': player['team_abbreviation'],
-                'stats': stats,
-                'combine_data': combine_data
-            })
+            # Ajouter les données du draft combine si disponibles (jointure précalculée)
+            combine_data = self.store.combine_dict(player_id)
+            player['combine_data'] = combine_data
+            lineup.append(player)
         
         return lineup
     
-    def calculate_lineup_score(self, lineup: List[Dict]) -> Tuple[float, str]:
+    def calculate_lineup_score(self, lineup, store: Optional[PlayerStore] = None) -> Tuple[float, str]:
         """Calcule le score d'une lineup basé sur les statistiques des joueurs et de l'équipe"""
+        if isinstance(lineup, Lineup):
+            scores, descriptions = self.score_lineups([lineup], store)
+            return float(scores[0]), descriptions[0]
+
         # Calculer les statistiques moyennes de la lineup
         lineup_stats = pd.DataFrame([player['stats'] for player in lineup])
         avg_stats = lineup_stats[self.features].mean()
         
         # Prédire le winrate avec le modèle
-        predicted_winrate = self.model.predict(avg_stats.values.reshape(1, -1))[0]
+        predicted_winrate = self._predict(avg_stats.values.reshape(1, -1))[0]
         
         # Calculer le bonus de cohérence
         coherence_bonus, coherence_desc = self.get_lineup_coherence(lineup)
@@ -269,16 +543,129 @@ class LineupPredictor:
         
         return predicted_winrate, coherence_desc
     
-    def predict_winner(self, lineup1: List[Dict], lineup2: List[Dict]) -> Tuple[List[Dict], float, float, str, str]:
-        """Prédit le gagnant entre deux lineups"""
-        score1, desc1 = self.calculate_lineup_score(lineup1)
-        score2, desc2 = self.calculate_lineup_score(lineup2)
+    def predict_winner(self, lineup1, lineup2,
+                       store: Optional[PlayerStore] = None) -> Tuple[List[Dict], float, float, str, str]:
+        """Prédit le gagnant entre deux lineups (listes de dicts ou objets Lineup)"""
+        if isinstance(lineup1, Lineup) and isinstance(lineup2, Lineup):
+            scores, descriptions = self.score_lineups([lineup1, lineup2], store)
+            (score1, score2), (desc1, desc2) = scores.tolist(), descriptions
+        else:
+            score1, desc1 = self.calculate_lineup_score(lineup1)
+            score2, desc2 = self.calculate_lineup_score(lineup2)
         
         if score1 > score2:
             return lineup1, score1, score2, desc1, desc2
         else:
             return lineup2, score2, score1, desc2, desc1
 
+    def _lineup_rows(self, lineups) -> np.ndarray:
+        """Matrice (N, 5) d'identifiants de joueurs (positions iloc dans players_data)"""
+        if isinstance(lineups, Lineup):
+            lineups = [lineups]
+        lineups = [lineup.ids if isinstance(lineup, Lineup) else lineup for lineup in lineups]
+        rows = np.asarray(lineups, dtype=np.int64)
+        if rows.ndim == 1:
+            rows = rows.reshape(1, -1)
+        if rows.ndim != 2:
+            raise ValueError(f"lineups doit être de forme (N, 5), reçu {rows.shape}")
+        return rows
+
+    @classmethod
+    def _coherence_table(cls) -> Tuple[np.ndarray, np.ndarray]:
+        """Bonus et descriptions indexés par nG * 36 + nF * 6 + nC (au plus 5 joueurs)"""
+        if cls._coherence_lookup is None:
+            bonuses = np.ones(6 ** 3)
+            descriptions = np.full(6 ** 3, "", dtype=object)
+            for n_g in range(6):
+                for n_f in range(6 - n_g):
+                    for n_c in range(6 - n_g - n_f):
+                        index = n_g * 36 + n_f * 6 + n_c
+                        bonuses[index], descriptions[index] = cls._coherence_from_positions(
+                            ['G'] * n_g + ['F'] * n_f + ['C'] * n_c
+                        )
+            cls._coherence_lookup = (bonuses, descriptions)
+        return cls._coherence_lookup
+
+    def coherence_batch(self, lineups, store: Optional[PlayerStore] = None) -> Tuple[np.ndarray, List[str]]:
+        """
+        Bonus et descriptions de cohérence pour N lineups (N, 5) : comptage des codes
+        de position par bincount puis lecture dans la table des compositions.
+        """
+        store = store or self.store
+        rows = self._lineup_rows(lineups)
+        if rows.shape[1] > 5:
+            raise ValueError(f"Une lineup compte au plus 5 joueurs, reçu {rows.shape[1]}")
+        codes = store.position_codes[rows].astype(np.int64)
+        # counts[i, code] = nombre de joueurs de la lineup i avec ce code (0 : inconnue)
+        offsets = np.arange(len(rows))[:, None] * 4
+        counts = np.bincount((offsets + codes).ravel(), minlength=len(rows) * 4).reshape(-1, 4)
+        index = counts[:, 1] * 36 + counts[:, 2] * 6 + counts[:, 3]
+
+        bonuses, descriptions = self._coherence_table()
+        return bonuses[index], descriptions[index].tolist()
+
+    def score_lineups(self, lineups, store: Optional[PlayerStore] = None) -> Tuple[np.ndarray, List[str]]:
+        """
+        Winrate prédit (bonus de cohérence inclus) de N lineups données en matrice
+        (N, 5) d'identifiants ou en objets Lineup : une seule indexation des
+        features et un seul appel au modèle pour tout le lot. Par défaut les
+        identifiants désignent les lignes de players_data (self.store).
+        """
+        store = store or self.store
+        rows = self._lineup_rows(lineups)
+        if self.score_cache is None or store is not self.store or len(rows) > self.SCORE_CACHE_MAX_BATCH:
+            return self._score_rows(rows, store)
+
+        # Lineup canonique : l'ordre des joueurs n'influe pas sur le score (A vs B puis B vs A)
+        keys = [(tuple(sorted(row)), self.artifact_key) for row in rows.tolist()]
+        cached = self.score_cache.get_many(keys)
+        missing = [i for i, value in enumerate(cached) if value is None]
+        if missing:
+            scores, descriptions = self._score_rows(rows[missing], store)
+            computed = dict(zip((keys[i] for i in missing), zip(scores.tolist(), descriptions)))
+            self.score_cache.put_many(computed)
+            for i in missing:
+                cached[i] = computed[keys[i]]
+        return np.array([value[0] for value in cached]), [value[1] for value in cached]
+
+    def _score_rows(self, rows: np.ndarray, store: PlayerStore) -> Tuple[np.ndarray, List[str]]:
+        """Score d'une matrice (N, 5) d'identifiants de `store`, sans cache"""
+        lineup_stats = store.feature_matrix[rows]
+        avg_stats = lineup_stats.mean(axis=1, dtype=np.float64)
+        if np.isnan(avg_stats).any():
+            # Comme DataFrame.mean : les stats manquantes sont ignorées
+            avg_stats = np.nanmean(lineup_stats.astype(np.float64), axis=1)
+        predicted = self._predict(avg_stats)
+
+        bonuses, descriptions = self.coherence_batch(rows, store)
+        return np.clip(predicted * bonuses, 0.0, 1.0), descriptions
+
+    def _predict(self, X: np.ndarray) -> np.ndarray:
+        """Winrates bruts du modèle pour une matrice de features (ordre de self.features)"""
+        # Au-delà de COMPILED_MAX_BATCH lignes, sklearn est plus rapide
+        if self.use_compiled and self.compiled is not None and len(X) <= COMPILED_MAX_BATCH:
+            return self.compiled.predict(X)
+        return self.model.predict(pd.DataFrame(X, columns=self.features))
+
+    def cache_info(self) -> Dict[str, float]:
+        """Compteurs du cache des scores (hits, misses, taille)"""
+        return self.score_cache.info() if self.score_cache is not None else {}
+
+    def predict_winners(self, pairs,
+                        store: Optional[PlayerStore] = None) -> Tuple[np.ndarray, np.ndarray, List[Tuple[str, str]]]:
+        """
+        Prédit le gagnant de N matchs donnés en tableau (N, 2, 5) d'indices de lignes.
+        Retourne l'indice du gagnant (0 ou 1, égalité -> 1 comme predict_winner),
+        les scores (N, 2) et les descriptions de cohérence.
+        """
+        pairs = np.asarray(pairs, dtype=np.int64)
+        if pairs.ndim == 2:
+            pairs = pairs.reshape(1, 2, -1)
+        scores, descriptions = self.score_lineups(pairs.reshape(-1, pairs.shape[-1]), store)
+        scores = scores.reshape(-1, 2)
+        winners = np.where(scores[:, 0] > scores[:, 1], 0, 1)
+        return winners, scores, list(zip(descriptions[0::2], descriptions[1::2]))
+
 # Exemple d'utilisation
 if __name__ == "__main__":
     predictor = LineupPredictor()
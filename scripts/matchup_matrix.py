@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Matrice des confrontations entre toutes les équipes existantes.
+
+Les lineups (top 5 aux points de chaque équipe de player_team_statistics.csv) sont
+notées en un seul appel batch ; la matrice N×N des probabilités de victoire (log5)
+est sauvegardée en .npz avec une clé liée au modèle et au CSV. Toute paire est
+ensuite une simple lecture de tableau, et la heatmap / le classement sont gratuits.
+
+Exemple :
+    python matchup_matrix.py
+"""
+
+import argparse
+import hashlib
+import os
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .data_cache import file_digest
+    from .data_registry import get_registry, load_dataset
+    from .lineup_predictor import LineupPredictor
+    from .tournament_simulator import log5, roster_lineups
+except ImportError:
+    from data_cache import file_digest
+    from data_registry import get_registry, load_dataset
+    from lineup_predictor import LineupPredictor
+    from tournament_simulator import log5, roster_lineups
+
+MATRIX_FILE = "matchup_matrix.npz"
+# À incrémenter quand le contenu du .npz change (2 : scores en float64, 3 : positions inconnues)
+MATRIX_VERSION = 3
+
+
+def matchup_key(predictor: LineupPredictor, rosters_path: str) -> str:
+    """Clé de la matrice : version du modèle + contenu du CSV des effectifs"""
+    model_key = predictor.artifact_key or predictor.compute_artifact_key()
+    return hashlib.sha256(f"{MATRIX_VERSION}|{model_key}|{file_digest(rosters_path)}".encode()).hexdigest()
+
+
+class MatchupMatrix:
+    """Scores des lineups et probabilités de victoire de chaque paire d'équipes"""
+    def __init__(self, teams, strengths, descriptions, key: Optional[str] = None):
+        self.teams = [str(team) for team in teams]
+        # float64 comme score_lineups : même score (et même vainqueur) avec ou sans la matrice
+        self.strengths = np.asarray(strengths, dtype=np.float64)
+        self.descriptions = [str(desc) for desc in descriptions]
+        self.probabilities = log5(self.strengths)
+        self.key = key
+        self.index: Dict[str, int] = {team: i for i, team in enumerate(self.teams)}
+
+    @classmethod
+    def build(cls, predictor: LineupPredictor, rosters: pd.DataFrame, k: int = 5,
+              key: Optional[str] = None) -> 'MatchupMatrix':
+        """Note toutes les lineups des équipes en un seul appel à score_lineups"""
+        teams, lineups, store = roster_lineups(rosters, predictor.features, k)
+        strengths, descriptions = predictor.score_lineups(lineups, store)
+        return cls(teams, strengths, descriptions, key)
+
+    def save(self, path: str):
+        """Sauvegarde compacte (.npz) ; écriture atomique"""
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            teams=np.array(self.teams),
+            strengths=self.strengths,
+            descriptions=np.array(self.descriptions),
+            key=np.array(self.key or ""),
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, key: Optional[str] = None) -> Optional['MatchupMatrix']:
+        """Charge la matrice ; None si absente ou calculée pour un autre modèle / CSV"""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            saved_key = str(data["key"])
+            if key is not None and saved_key != key:
+                return None
+            return cls(data["teams"], data["strengths"], data["descriptions"], saved_key)
+
+    def __contains__(self, team: str) -> bool:
+        return team in self.index
+
+    def lookup(self, team_a: str, team_b: str) -> Tuple[float, float, str, str, float]:
+        """(score A, score B, cohérence A, cohérence B, probabilité que A batte B)"""
+        a, b = self.index[team_a], self.index[team_b]
+        return (float(self.strengths[a]), float(self.strengths[b]),
+                self.descriptions[a], self.descriptions[b], float(self.probabilities[a, b]))
+
+    def frame(self) -> pd.DataFrame:
+        """Matrice des probabilités (ligne : équipe, colonne : adversaire)"""
+        return pd.DataFrame(self.probabilities, index=self.teams, columns=self.teams)
+
+    def power_ranking(self) -> pd.DataFrame:
+        """Classement par probabilité moyenne de victoire contre toutes les autres équipes"""
+        n = len(self.teams)
+        expected = (self.probabilities.sum(axis=1) - 0.5) / max(n - 1, 1)
+        ranking = pd.DataFrame({
+            "team": self.teams,
+            "predicted_win_rate": self.strengths,
+            "expected_win_pct": expected,
+            "coherence": self.descriptions,
+        }).sort_values("expected_win_pct", ascending=False, kind="stable")
+        ranking.insert(0, "rank", np.arange(1, n + 1))
+        return ranking.reset_index(drop=True)
+
+
+def load_or_build(predictor: LineupPredictor, rosters: Optional[pd.DataFrame] = None,
+                  path: Optional[str] = None) -> MatchupMatrix:
+    """Matrice sauvegardée si elle est à jour, sinon recalculée puis sauvegardée"""
+    registry = get_registry()
+    path = path or registry.file(MATRIX_FILE)
+    key = matchup_key(predictor, registry.path("prefab_teams"))
+    matrix = MatchupMatrix.load(path, key)
+    if matrix is None:
+        rosters = rosters if rosters is not None else load_dataset("prefab_teams")
+        matrix = MatchupMatrix.build(predictor, rosters, key=key)
+        matrix.save(path)
+    return matrix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Matrice des confrontations entre équipes existantes")
+    parser.add_argument("--output", default=None, help=f"fichier .npz (défaut : {MATRIX_FILE} du registre)")
+    args = parser.parse_args()
+
+    predictor = LineupPredictor()
+    predictor.load_data(artifact_path=get_registry().file("lineup_predictor.pkl"))
+    matrix = load_or_build(predictor, path=args.output)
+    print(matrix.power_ranking().to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
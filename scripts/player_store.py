@@ -0,0 +1,302 @@
+"""
+Stockage des joueurs en tableaux NumPy.
+
+Chaque ligne (joueur-saison) reçoit un identifiant dense = sa position dans la
+table d'origine. Les statistiques sont gardées dans une matrice float32 contiguë
+et une lineup n'est plus qu'un tuple de 5 identifiants : les dicts par joueur ne
+sont construits qu'à l'affichage.
+"""
+
+import bisect
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Statistiques par joueur utilisées par le modèle et l'affichage
+STAT_COLUMNS = [
+    'pts_per_game', 'reb_per_game', 'ast_per_game', 'net_rating',
+    'oreb_pct', 'dreb_pct', 'usg_pct', 'ts_pct', 'ast_pct',
+    'ast_usg_ratio', 'reb_pct_sum', 'efficiency', 'scoring_efficiency', 'playmaking'
+]
+
+# Données du draft combine affichées : clé d'affichage -> colonne du CSV
+COMBINE_COLUMNS = {
+    'height': 'height_wo_shoes_cm',
+    'wingspan': 'wingspan_cm',
+    'standing_reach': 'standing_reach_cm',
+    'body_fat': 'body_fat_pct',
+    'vertical_leap': 'standing_vertical_leap',
+    'max_vertical': 'max_vertical_leap',
+    'agility': 'lane_agility_time',
+    'sprint': 'three_quarter_sprint',
+}
+
+
+# Position principale codée sur un int8 : 0 inconnue, 1 Guard, 2 Forward, 3 Center
+POSITION_LABELS = np.array([np.nan, 'G', 'F', 'C'], dtype=object)
+POSITION_CODES = {'G': 1, 'F': 2, 'C': 3}
+
+
+def classify_positions(positions: pd.Series) -> np.ndarray:
+    """
+    Code de la position principale à partir de la position NBA ("Guard-Forward"...),
+    mêmes règles que get_primary_pos mais vectorisées : Guard sans Center -> G,
+    Center -> C, Forward -> F, sinon inconnue.
+    """
+    upper = positions.astype(object).str.upper()
+    guard = upper.str.contains('GUARD', regex=False, na=False).to_numpy()
+    forward = upper.str.contains('FORWARD', regex=False, na=False).to_numpy()
+    center = upper.str.contains('CENTER', regex=False, na=False).to_numpy()
+
+    codes = np.zeros(len(positions), dtype=np.int8)
+    codes[forward] = POSITION_CODES['F']
+    codes[center] = POSITION_CODES['C']
+    codes[guard & ~center] = POSITION_CODES['G']
+    return codes
+
+
+def encode_positions(labels) -> np.ndarray:
+    """Codes int8 à partir des libellés G / F / C (autre valeur : inconnue)"""
+    return pd.Series(labels, dtype=object).map(POSITION_CODES).fillna(0).to_numpy(dtype=np.int8)
+
+
+def normalize_name(name: str) -> str:
+    """Nom sans accents, en minuscules, mots séparés par une espace ("Luka Dončić" -> "luka doncic")"""
+    text = unicodedata.normalize('NFKD', str(name))
+    text = ''.join(c if c.isalnum() else ' ' for c in text if not unicodedata.combining(c))
+    return ' '.join(text.lower().split())
+
+
+def season_label(year: int) -> str:
+    return f"{year}-{str(year + 1)[-2:]}"
+
+
+def _first_match(keys, values) -> np.ndarray:
+    """Pour chaque valeur, position de sa première occurrence dans `keys` (-1 si absente)"""
+    keys = pd.Series(keys)
+    first = np.flatnonzero(~keys.duplicated().to_numpy() & keys.notna().to_numpy())
+    positions = pd.Index(keys.iloc[first]).get_indexer(values)
+    return np.where(positions >= 0, first[positions], -1)
+
+
+class Lineup:
+    """Lineup réduite aux identifiants de ses joueurs dans un PlayerStore"""
+    __slots__ = ("ids",)
+
+    def __init__(self, ids: Iterable[int]):
+        self.ids = tuple(int(i) for i in ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __repr__(self) -> str:
+        return f"Lineup{self.ids}"
+
+
+class PlayerStore:
+    """
+    Table des joueurs en colonnes NumPy. Les colonnes absentes de `players` valent
+    0 (comme `row.get(k, 0)` pour les CSV d'équipes sans toutes les stats).
+    position_column=None : positions inconnues pour tous les joueurs.
+    """
+    def __init__(self, players: pd.DataFrame, features: List[str],
+                 position_column: Optional[str] = 'primary_pos', season_column: str = 'season_year'):
+        self.columns = STAT_COLUMNS + [f for f in features if f not in STAT_COLUMNS]
+        self.column_index = {col: j for j, col in enumerate(self.columns)}
+        self.stats = np.zeros((len(players), len(self.columns)), dtype=np.float32)
+        for j, col in enumerate(self.columns):
+            if col in players.columns:
+                self.stats[:, j] = players[col].to_numpy(dtype=np.float32)
+
+        # Sous-matrice des features du modèle, contiguë pour l'indexation par lot
+        self.features = list(features)
+        self.feature_matrix = np.ascontiguousarray(
+            self.stats[:, [self.column_index[f] for f in self.features]]
+        )
+
+        # Noms et équipes en codes entiers + catégories
+        names = pd.Categorical(players['player_name'])
+        self.name_codes = names.codes.astype(np.int32)
+        self.name_categories = np.asarray(names.categories, dtype=object)
+        teams = pd.Categorical(players['team_abbreviation']) if 'team_abbreviation' in players.columns \
+            else pd.Categorical([None] * len(players))
+        self.team_codes = teams.codes.astype(np.int32)
+        self.team_categories = np.asarray(teams.categories, dtype=object)
+
+        if position_column is not None and position_column in players.columns:
+            self.position_codes = encode_positions(players[position_column].to_numpy(dtype=object))
+        else:
+            self.position_codes = np.zeros(len(players), dtype=np.int8)
+        if 'person_id' in players.columns:
+            self.person_ids = players['person_id'].fillna(-1).to_numpy(dtype=np.int64)
+        else:
+            self.person_ids = np.full(len(players), -1, dtype=np.int64)
+        if season_column in players.columns:
+            self.seasons = players[season_column].to_numpy(dtype=np.int32)
+        else:
+            self.seasons = np.zeros(len(players), dtype=np.int32)
+
+        # Jointure draft combine : ligne du combine de chaque joueur (-1 : absent)
+        self.combine = np.empty((0, len(COMBINE_COLUMNS)), dtype=np.float32)
+        self.combine_rows = np.full(len(players), -1, dtype=np.int32)
+
+    def attach_combine(self, combine: pd.DataFrame) -> 'PlayerStore':
+        """
+        Joint une fois pour toutes les données du draft combine : par person_id
+        (colonne player_id du combine), sinon par nom. Une mesure absente vaut NaN.
+        """
+        self.combine = np.full((len(combine), len(COMBINE_COLUMNS)), np.nan, dtype=np.float32)
+        for j, col in enumerate(COMBINE_COLUMNS.values()):
+            if col in combine.columns:
+                self.combine[:, j] = combine[col].to_numpy(dtype=np.float32)
+
+        rows = np.full(len(self), -1, dtype=np.int64)
+        if 'player_id' in combine.columns:
+            has_id = self.person_ids >= 0
+            rows[has_id] = _first_match(combine['player_id'].to_numpy(), self.person_ids[has_id])
+        if 'player_name' in combine.columns:
+            # Un seul calcul par nom distinct, puis indexation par code
+            by_name = _first_match(combine['player_name'].astype(object).to_numpy(), self.name_categories)
+            missing = (rows < 0) & (self.name_codes >= 0)
+            rows[missing] = by_name[self.name_codes[missing]]
+        self.combine_rows = rows.astype(np.int32)
+        return self
+
+    def __len__(self) -> int:
+        return len(self.stats)
+
+    def name(self, player_id: int) -> str:
+        return self.name_categories[self.name_codes[player_id]]
+
+    def team(self, player_id: int):
+        code = self.team_codes[player_id]
+        return self.team_categories[code] if code >= 0 else None
+
+    def teams(self, ids: np.ndarray) -> np.ndarray:
+        """Équipes de plusieurs joueurs (None si inconnue)"""
+        codes = self.team_codes[ids]
+        teams = np.full(len(codes), None, dtype=object)
+        teams[codes >= 0] = self.team_categories[codes[codes >= 0]]
+        return teams
+
+    def stats_dict(self, player_id: int) -> Dict[str, float]:
+        """Statistiques d'un joueur (format des anciens dicts 'stats')"""
+        return {col: float(self.stats[player_id, j]) for j, col in enumerate(STAT_COLUMNS)}
+
+    def combine_dict(self, player_id: int) -> Dict[str, float]:
+        """Données du draft combine d'un joueur ({} s'il n'a pas participé)"""
+        row = self.combine_rows[player_id]
+        if row < 0:
+            return {}
+        return {key: float(value) for key, value in zip(COMBINE_COLUMNS, self.combine[row])}
+
+    def combine_frame(self, lineups) -> pd.DataFrame:
+        """
+        Enrichissement par lot : une ligne par (lineup, joueur) avec nom, équipe et
+        données du combine, obtenue par une seule indexation des tableaux.
+        """
+        ids = np.asarray([lineup.ids if isinstance(lineup, Lineup) else lineup for lineup in lineups],
+                         dtype=np.int64)
+        if ids.ndim == 1:
+            ids = ids.reshape(1, -1)
+        flat = ids.ravel()
+        rows = self.combine_rows[flat]
+        values = np.full((len(flat), len(COMBINE_COLUMNS)), np.nan, dtype=np.float32)
+        values[rows >= 0] = self.combine[rows[rows >= 0]]
+
+        df = pd.DataFrame(values, columns=list(COMBINE_COLUMNS))
+        df.insert(0, 'has_combine', rows >= 0)
+        df.insert(0, 'team_abbreviation', self.teams(flat))
+        df.insert(0, 'player_name', self.name_categories[self.name_codes[flat]])
+        df.insert(0, 'player', flat)
+        df.insert(0, 'lineup', np.repeat(np.arange(len(ids)), ids.shape[1]))
+        return df
+
+    def player(self, player_id: int) -> Dict:
+        """Dict d'affichage d'un joueur (sans données du draft combine)"""
+        person_id = self.person_ids[player_id]
+        return {
+            'player_id': int(person_id) if person_id >= 0 else None,
+            'name': self.name(player_id),
+            'position': POSITION_LABELS[self.position_codes[player_id]],
+            'team': self.team(player_id),
+            'stats': self.stats_dict(player_id),
+        }
+
+    def frame(self, ids: Iterable[int]) -> pd.DataFrame:
+        """Statistiques des joueurs `ids` en DataFrame (agrégats d'affichage)"""
+        ids = np.asarray(list(ids), dtype=np.int64)
+        df = pd.DataFrame(self.stats[ids][:, :len(STAT_COLUMNS)], columns=STAT_COLUMNS)
+        df.insert(0, 'team_abbreviation', self.teams(ids))
+        df.insert(0, 'player_name', self.name_categories[self.name_codes[ids]])
+        return df
+
+    def ids_for_names(self, names: Iterable[str]) -> np.ndarray:
+        """Identifiants de toutes les saisons des joueurs `names`"""
+        codes = np.flatnonzero(np.isin(self.name_categories, list(names)))
+        return np.flatnonzero(np.isin(self.name_codes, codes))
+
+    def latest_ids(self, names: Iterable[str]) -> List[int]:
+        """Pour chaque nom, l'identifiant de sa saison la plus récente (ordre des noms conservé)"""
+        lookup = {name: code for code, name in enumerate(self.name_categories)}
+        ids = []
+        for name in names:
+            rows = np.flatnonzero(self.name_codes == lookup[name])
+            ids.append(int(rows[np.argmax(self.seasons[rows])]))
+        return ids
+
+
+class PlayerSearchIndex:
+    """
+    Recherche par préfixe des joueurs-saisons d'un PlayerStore. Chaque nom
+    normalisé est indexé entier et à partir de chacun de ses mots ("james" trouve
+    "LeBron James") dans une liste triée : une recherche = deux bisect. Les
+    résultats sont des identifiants du store, une saison précise par joueur.
+    """
+    def __init__(self, store: PlayerStore):
+        self.store = store
+        entries = set()
+        for code, name in enumerate(store.name_categories):
+            words = normalize_name(name).split()
+            for i in range(len(words)):
+                entries.add((' '.join(words[i:]), code))
+        entries = sorted(entries)
+        self.keys = [key for key, _ in entries]
+        self.codes = np.array([code for _, code in entries], dtype=np.int32)
+
+        # Joueur-saison par (saison, nom) et saison la plus récente de chaque nom
+        valid = np.flatnonzero(store.name_codes >= 0)
+        order = valid[np.lexsort((-store.seasons[valid], store.name_codes[valid]))]
+        self.seasons = sorted(int(y) for y in np.unique(store.seasons[valid]))
+        self.by_season: Dict[int, Dict[int, int]] = {year: {} for year in self.seasons}
+        for player_id in order[::-1]:
+            # Parcours du plus ancien au plus récent : la première ligne d'un (saison, nom) est gardée en dernier
+            self.by_season[int(store.seasons[player_id])][int(store.name_codes[player_id])] = int(player_id)
+        self.latest = {int(store.name_codes[i]): int(i) for i in order[::-1]}
+
+    def search(self, query: str = '', season: Optional[int] = None, limit: Optional[int] = None) -> List[int]:
+        """
+        Identifiants des joueurs dont un mot du nom commence par `query`, triés par
+        nom : ligne de la saison `season`, ou saison la plus récente si None.
+        """
+        prefix = normalize_name(query)
+        if prefix:
+            lo = bisect.bisect_left(self.keys, prefix)
+            hi = bisect.bisect_left(self.keys, prefix + '\U0010ffff', lo)
+            codes = np.unique(self.codes[lo:hi])
+        else:
+            codes = np.arange(len(self.store.name_categories))
+        rows = self.latest if season is None else self.by_season.get(season, {})
+        ids = [rows[code] for code in codes.tolist() if code in rows]
+        return ids if limit is None else ids[:limit]
+
+    def label(self, player_id: int) -> str:
+        """Libellé d'un joueur-saison : nom · équipe · saison"""
+        team = self.store.team(player_id)
+        season = season_label(int(self.store.seasons[player_id]))
+        return f"{self.store.name(player_id)} · {team} · {season}" if team else f"{self.store.name(player_id)} · {season}"
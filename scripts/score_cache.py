@@ -0,0 +1,67 @@
+"""
+Cache LRU thread-safe pour les scores de lineups.
+
+Partagé entre les sessions Streamlit via le LineupPredictor mis en cache
+(st.cache_resource) : les accès sont protégés par un verrou.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional
+
+
+class LRUCache:
+    """Dictionnaire borné : l'entrée la moins récemment utilisée est évincée"""
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_many(self, keys: List[Hashable]) -> List[Optional[object]]:
+        """Valeurs des clés (None si absentes), comptées en hits / misses"""
+        values = []
+        with self._lock:
+            for key in keys:
+                value = self._data.get(key)
+                if value is None:
+                    self.misses += 1
+                else:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                values.append(value)
+        return values
+
+    def get(self, key: Hashable) -> Optional[object]:
+        return self.get_many([key])[0]
+
+    def put_many(self, items: Dict[Hashable, object]):
+        with self._lock:
+            for key, value in items.items():
+                self._data[key] = value
+                self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def put(self, key: Hashable, value: object):
+        self.put_many({key: value})
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+            }
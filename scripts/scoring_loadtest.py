@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Client de charge du service de notation (scoring_service.py).
+
+Simule des outils internes : `--concurrency` clients asyncio, chacun sur une
+connexion persistante, envoient des POST /score de lineups aléatoires (identifiants
+joueurs-saisons). Affiche débit et latences côté client, puis /metrics du serveur
+(taille moyenne des lots, file d'attente, latences côté serveur).
+
+Exemple :
+    python scoring_service.py --port 8765 &
+    python scoring_loadtest.py --port 8765 --concurrency 64 --requests 5000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class Client:
+    """Connexion HTTP/1.1 persistante vers le service"""
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, payload: Optional[Dict] = None) -> Tuple[int, Dict]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def worker(client: Client, n_players: int, counter: List[int], total: int, lineups: int,
+                 latencies: List[float], errors: List[int], rng: random.Random):
+    while counter[0] < total:
+        counter[0] += 1
+        payload = {"lineups": [rng.sample(range(n_players), 5) for _ in range(lineups)]}
+        start = time.perf_counter()
+        status, _ = await client.request("POST", "/score", payload)
+        latencies.append(time.perf_counter() - start)
+        if status != 200:
+            errors[0] += 1
+
+
+async def run(host: str, port: int, concurrency: int, total: int, lineups: int, seed: int):
+    probe = Client(host, port)
+    _, health = await probe.request("GET", "/health")
+    clients = [Client(host, port) for _ in range(concurrency)]
+    counter, latencies, errors = [0], [], [0]
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        worker(client, health["players"], counter, total, lineups, latencies, errors, random.Random(seed + i))
+        for i, client in enumerate(clients)
+    ))
+    elapsed = time.perf_counter() - start
+    _, metrics = await probe.request("GET", "/metrics")
+    for client in clients + [probe]:
+        client.close()
+
+    ms = np.array(latencies) * 1e3
+    print(f"{len(latencies)} requêtes ({lineups} lineup(s) chacune, {concurrency} clients) en {elapsed:.2f}s : "
+          f"{len(latencies) / elapsed:.0f} req/s, {errors[0]} erreurs")
+    print(f"Latence client : p50 {np.percentile(ms, 50):.2f} ms, p99 {np.percentile(ms, 99):.2f} ms")
+    batcher = metrics["batcher"]
+    print(f"Serveur : {batcher['batches']} appels au modèle, lot moyen {batcher['mean_batch']:.1f} "
+          f"(max {batcher['max_batch_seen']}), file d'attente {batcher['queue_depth']} "
+          f"(max {batcher['max_queue_depth']})")
+    for route, stats in metrics["latency"].items():
+        print(f"  {route} : {stats['count']} requêtes, p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge du service de notation des lineups")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--lineups", type=int, default=1, help="lineups par requête")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(run(args.host, args.port, args.concurrency, args.requests, args.lineups, args.seed))
+
+
+if __name__ == "__main__":
+    main()
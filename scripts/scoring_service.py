@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Service HTTP/JSON local de notation des lineups (sans Streamlit).
+
+Serveur asyncio (bibliothèque standard uniquement) autour d'un LineupPredictor :
+    POST /score        {"lineups": [[id x5] | [nom x5], ...], "season": 2022}
+    POST /matchup      {"a": lineup, "b": lineup} ou {"team_a": "...", "team_b": "..."}
+    GET  /dream-team   ?season=2022-23&rank=1
+    GET  /metrics      latences p50 / p99 par route, file d'attente, lots
+    GET  /health
+Les lineups sont des identifiants joueurs-saisons du PlayerStore ou des noms
+(saison `season`, sinon la plus récente). Les requêtes /score et /matchup
+arrivées dans la même fenêtre (--max-wait-ms) sont regroupées en un seul appel
+au modèle, jusqu'à --max-batch lineups.
+
+Exemple :
+    python scoring_service.py --port 8765 --max-batch 256 --max-wait-ms 2
+    curl -s localhost:8765/score -d '{"lineups": [["LeBron James", "Stephen Curry", ...]]}'
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+try:
+    from .data_registry import get_registry, load_dataset
+    from .dream_team_views import build_views
+    from .lineup_predictor import LineupPredictor
+    from .matchup_matrix import load_or_build as load_or_build_matchups
+    from .player_store import normalize_name
+    from .tournament_simulator import log5
+except ImportError:
+    from data_registry import get_registry, load_dataset
+    from dream_team_views import build_views
+    from lineup_predictor import LineupPredictor
+    from matchup_matrix import load_or_build as load_or_build_matchups
+    from player_store import normalize_name
+    from tournament_simulator import log5
+
+LINEUP_SIZE = 5
+MAX_BODY = 1 << 20
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+def _json_default(value):
+    """Scalaires NumPy -> types Python"""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} non sérialisable en JSON")
+
+
+class LatencyStats:
+    """Latences des dernières requêtes par route (fenêtre glissante)"""
+    def __init__(self, window: int = 10_000):
+        self.samples: Dict[str, deque] = defaultdict(lambda: deque(maxlen=window))
+        self.counts = Counter()
+
+    def record(self, route: str, seconds: float):
+        self.samples[route].append(seconds)
+        self.counts[route] += 1
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        summary = {}
+        for route, samples in self.samples.items():
+            values = np.fromiter(samples, dtype=np.float64) * 1e3
+            p50, p99 = np.percentile(values, [50, 99])
+            summary[route] = {"count": self.counts[route], "p50_ms": float(p50), "p99_ms": float(p99)}
+        return summary
+
+
+class MicroBatcher:
+    """
+    Regroupe les demandes de notation : le premier lot attend au plus `max_wait`
+    secondes d'autres demandes, jusqu'à `max_batch` lignes, puis un seul appel à
+    `score_fn` (dans un thread, la boucle asyncio reste libre) répond à toutes.
+    """
+    def __init__(self, score_fn: Callable[[np.ndarray], Tuple[np.ndarray, List[str]]],
+                 max_batch: int = 256, max_wait: float = 0.002):
+        self.score_fn = score_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue: Optional[asyncio.Queue] = None
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.batches = 0
+        self.rows = 0
+        self.max_batch_seen = 0
+        self.max_depth = 0
+        self._task = None
+
+    def start(self):
+        self.queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+        self.executor.shutdown(wait=False)
+
+    def depth(self) -> int:
+        """Demandes en attente d'un lot"""
+        return self.queue.qsize() if self.queue is not None else 0
+
+    async def score(self, rows: np.ndarray) -> Tuple[np.ndarray, List[str]]:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((rows, future))
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+        return await future
+
+    async def _collect(self) -> List[Tuple[np.ndarray, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        items = [await self.queue.get()]
+        size = len(items[0][0])
+        deadline = loop.time() + self.max_wait
+        while size < self.max_batch:
+            if self.queue.empty():
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = self.queue.get_nowait()
+            items.append(item)
+            size += len(item[0])
+        return items
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = await self._collect()
+            rows = np.concatenate([rows for rows, _ in items])
+            self.batches += 1
+            self.rows += len(rows)
+            self.max_batch_seen = max(self.max_batch_seen, len(rows))
+            try:
+                scores, descriptions = await loop.run_in_executor(self.executor, self.score_fn, rows)
+            except Exception as exc:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            offset = 0
+            for item_rows, future in items:
+                end = offset + len(item_rows)
+                if not future.done():
+                    future.set_result((scores[offset:end], descriptions[offset:end]))
+                offset = end
+
+    def info(self) -> Dict[str, float]:
+        return {
+            "queue_depth": self.depth(),
+            "max_queue_depth": self.max_depth,
+            "batches": self.batches,
+            "mean_batch": self.rows / self.batches if self.batches else 0.0,
+            "max_batch_seen": self.max_batch_seen,
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1e3,
+        }
+
+
+class ScoringService:
+    """Routes JSON du service ; le modèle n'est appelé qu'à travers le MicroBatcher"""
+    def __init__(self, predictor: LineupPredictor, max_batch: int = 256, max_wait: float = 0.002):
+        self.predictor = predictor
+        self.batcher = MicroBatcher(predictor.score_lineups, max_batch, max_wait)
+        self.latency = LatencyStats()
+        self.started = time.time()
+        # Matrice des équipes et vues Dream Team : chargées à la première demande dans
+        # un thread dédié (la boucle et le MicroBatcher continuent de servir /score)
+        self._matchups = None
+        self._views = None
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self._load_locks = {"_matchups": asyncio.Lock(), "_views": asyncio.Lock()}
+        # Nom normalisé -> code du nom dans le store
+        index = predictor.search_index
+        self.name_codes = {normalize_name(name): code for code, name in enumerate(index.store.name_categories)}
+
+    async def _load(self, attr: str, loader: Callable):
+        """Valeur de l'attribut, calculée une seule fois hors de la boucle asyncio"""
+        if getattr(self, attr) is None:
+            async with self._load_locks[attr]:
+                if getattr(self, attr) is None:
+                    value = await asyncio.get_running_loop().run_in_executor(self.executor, loader)
+                    setattr(self, attr, value)
+        return getattr(self, attr)
+
+    # ---------- lineups ----------
+    def resolve(self, lineup, season=None) -> List[int]:
+        """Identifiants joueurs-saisons d'une lineup (identifiants ou noms ; saison 2022 ou "2022-23")"""
+        if isinstance(season, str):
+            season = int(season[:4])
+        if not isinstance(lineup, list) or len(lineup) != LINEUP_SIZE:
+            raise ValueError(f"Une lineup est une liste de {LINEUP_SIZE} joueurs")
+        index = self.predictor.search_index
+        ids = []
+        for player in lineup:
+            if isinstance(player, str):
+                code = self.name_codes.get(normalize_name(player))
+                rows = index.latest if season is None else index.by_season.get(season, {})
+                if code is None or code not in rows:
+                    where = "" if season is None else f" en {season}"
+                    raise ValueError(f"Joueur inconnu{where} : {player}")
+                ids.append(rows[code])
+            elif isinstance(player, int) and not isinstance(player, bool) and 0 <= player < len(index.store):
+                ids.append(player)
+            else:
+                raise ValueError(f"Identifiant invalide : {player!r}")
+        return ids
+
+    async def score(self, body: Dict) -> Dict:
+        if not isinstance(body, dict):
+            raise ValueError("Corps JSON : objet attendu")
+        lineups = body.get("lineups")
+        if not isinstance(lineups, list) or not lineups:
+            raise ValueError("'lineups' : liste de lineups attendue")
+        rows = np.array([self.resolve(lineup, body.get("season")) for lineup in lineups], dtype=np.int64)
+        scores, descriptions = await self.batcher.score(rows)
+        return {"lineups": rows.tolist(), "scores": scores.tolist(), "coherence": list(descriptions)}
+
+    async def matchup(self, body: Dict) -> Dict:
+        if not isinstance(body, dict):
+            raise ValueError("Corps JSON : objet attendu")
+        if "team_a" in body or "team_b" in body:
+            return await self.team_matchup(body.get("team_a"), body.get("team_b"))
+        season = body.get("season")
+        rows = np.array([self.resolve(body.get("a"), season), self.resolve(body.get("b"), season)],
+                        dtype=np.int64)
+        scores, descriptions = await self.batcher.score(rows)
+        probability = log5(scores)[0, 1]
+        return {
+            "lineups": rows.tolist(),
+            "scores": scores.tolist(),
+            "coherence": list(descriptions),
+            # Égalité -> b, comme predict_winner
+            "winner": "a" if scores[0] > scores[1] else "b",
+            "probability_a": float(probability),
+        }
+
+    async def team_matchup(self, team_a: str, team_b: str) -> Dict:
+        """Lecture dans la matrice des confrontations des équipes existantes"""
+        matchups = await self._load("_matchups", lambda: load_or_build_matchups(self.predictor))
+        for team in (team_a, team_b):
+            if team not in matchups:
+                raise ValueError(f"Équipe inconnue : {team}")
+        score_a, score_b, desc_a, desc_b, probability = matchups.lookup(team_a, team_b)
+        return {
+            "teams": [team_a, team_b],
+            "scores": [score_a, score_b],
+            "coherence": [desc_a, desc_b],
+            "winner": "a" if score_a > score_b else "b",
+            "probability_a": probability,
+        }
+
+    async def dream_team(self, query: Dict[str, List[str]]) -> Dict:
+        views = await self._load(
+            "_views", lambda: build_views(load_dataset("dream_teams"), load_dataset("final_players_stats"))
+        )
+        season = query.get("season", [None])[0]
+        if season not in views:
+            raise ValueError(f"Saison inconnue : {season} (disponibles : {sorted(views)})")
+        rank = int(query.get("rank", ["1"])[0])
+        if rank not in views[season]:
+            raise ValueError(f"Rang inconnu : {rank}")
+        view = views[season][rank]
+        return {
+            "season": season,
+            "rank": rank,
+            "players": view.player_names,
+            "predicted_win": view.predicted_win,
+            "stats_sum": view.stats_somme,
+            "stats_mean": view.stats_moyenne,
+        }
+
+    def metrics(self) -> Dict:
+        return {
+            "uptime_s": time.time() - self.started,
+            "latency": self.latency.summary(),
+            "batcher": self.batcher.info(),
+            "score_cache": self.predictor.cache_info(),
+        }
+
+    # ---------- HTTP ----------
+    async def dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, Dict]:
+        url = urlsplit(target)
+        routes = {
+            ("POST", "/score"): lambda: self.score(json.loads(body or b"{}")),
+            ("POST", "/matchup"): lambda: self.matchup(json.loads(body or b"{}")),
+        }
+        try:
+            if (method, url.path) in routes:
+                return 200, await routes[method, url.path]()
+            if method == "GET" and url.path == "/dream-team":
+                return 200, await self.dream_team(parse_qs(url.query))
+            if method == "GET" and url.path == "/metrics":
+                return 200, self.metrics()
+            if method == "GET" and url.path == "/health":
+                return 200, {"status": "ok", "model": self.predictor.artifact_key,
+                             "players": len(self.predictor.store)}
+            if url.path in ("/score", "/matchup", "/dream-team", "/metrics", "/health"):
+                return 405, {"error": f"Méthode {method} non autorisée sur {url.path}"}
+            return 404, {"error": f"Route inconnue : {url.path}"}
+        except (ValueError, KeyError, TypeError) as exc:
+            # json.JSONDecodeError est une ValueError
+            return 400, {"error": str(exc)}
+        except Exception as exc:
+            return 500, {"error": f"{type(exc).__name__}: {exc}"}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """HTTP/1.1 minimal : Content-Length, connexions persistantes"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                start = time.perf_counter()
+                parts = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                if len(parts) != 3:
+                    status, payload = 400, {"error": "Requête HTTP invalide"}
+                    body = b""
+                else:
+                    try:
+                        length = int(headers.get("content-length", 0) or 0)
+                    except ValueError:
+                        length = -1
+                    if length < 0:
+                        # Corps de taille inconnue : impossible de rester synchronisé, connexion fermée
+                        status, payload = 400, {"error": "Content-Length invalide"}
+                        body = None
+                    elif length > MAX_BODY:
+                        status, payload = 413, {"error": f"Corps limité à {MAX_BODY} octets"}
+                        body = None
+                    else:
+                        body = await reader.readexactly(length) if length else b""
+                        status, payload = await self.dispatch(parts[0].upper(), parts[1], body)
+
+                data = json.dumps(payload, default=_json_default).encode()
+                keep_alive = body is not None and headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if len(parts) == 3:
+                    self.latency.record(urlsplit(parts[1]).path, time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            # Client parti ou arrêt du serveur : la connexion est simplement fermée
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765):
+        self.batcher.start()
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Service de notation sur http://{host}:{port} "
+              f"(lots de {self.batcher.max_batch} max, attente {self.batcher.max_wait * 1e3:.1f} ms)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+            self.executor.shutdown(wait=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Service HTTP/JSON de notation des lineups")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch", type=int, default=256, help="lineups max par appel au modèle")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0,
+                        help="attente max d'autres requêtes avant l'appel au modèle")
+    parser.add_argument("--artifact", default=None, help="artefact du predictor (défaut : lineup_predictor.pkl)")
+    args = parser.parse_args()
+
+    predictor = LineupPredictor()
+    predictor.load_data(artifact_path=args.artifact or get_registry().file("lineup_predictor.pkl"))
+    service = ScoringService(predictor, args.max_batch, args.max_wait_ms / 1e3)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
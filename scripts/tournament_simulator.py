@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Simulation Monte Carlo de saisons / tournois entre lineups.
+
+La force de chaque équipe est le winrate prédit par LineupPredictor (bonus de
+cohérence inclus). La probabilité qu'une équipe batte une autre est obtenue par
+la formule log5, puis des milliers de saisons (round-robin + playoffs) ou de
+tableaux à élimination directe sont tirés avec le générateur NumPy, par lots de
+simulations traitées en une fois (aucune boucle Python par match).
+
+Exemple (équipes de player_team_statistics.csv) :
+    python tournament_simulator.py --sims 100000 --playoff-teams 16 --workers 4
+"""
+
+import argparse
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .data_registry import get_registry, load_dataset
+    from .lineup_predictor import LineupPredictor, top_n_per_group
+    from .player_store import Lineup, PlayerStore
+except ImportError:
+    from data_registry import get_registry, load_dataset
+    from lineup_predictor import LineupPredictor, top_n_per_group
+    from player_store import Lineup, PlayerStore
+
+MODES = ("season", "bracket")
+
+
+def log5(strengths: np.ndarray) -> np.ndarray:
+    """Matrice P[i, j] = probabilité que i batte j (formule log5 de Bill James)"""
+    s = np.clip(np.asarray(strengths, dtype=np.float64), 1e-6, 1 - 1e-6)
+    num = s[:, None] * (1 - s[None, :])
+    p = num / (num + s[None, :] * (1 - s[:, None]))
+    np.fill_diagonal(p, 0.5)
+    return p
+
+
+def series_probabilities(p: np.ndarray, length: int) -> np.ndarray:
+    """Probabilité de gagner une série au meilleur de `length` matchs (length impair)"""
+    if length == 1:
+        return p
+    if length % 2 == 0:
+        raise ValueError("Une série se joue en un nombre impair de matchs")
+    need = length // 2 + 1
+    # Gagner `need` matchs avant d'en perdre `need` : somme sur le nombre de défaites j
+    return sum(math.comb(need - 1 + j, j) * p ** need * (1 - p) ** j for j in range(need))
+
+
+def bracket_order(size: int) -> np.ndarray:
+    """Têtes de série par emplacement du tableau (1-16, 8-9, ...), indices à partir de 0"""
+    if size < 2 or size & (size - 1):
+        raise ValueError(f"Le tableau doit compter une puissance de 2 d'équipes, reçu {size}")
+    order = [1]
+    while len(order) < size:
+        order = [seed for s in order for seed in (s, 2 * len(order) + 1 - s)]
+    return np.array(order) - 1
+
+
+def _simulate_shard(probabilities: np.ndarray, n_sims: int, mode: str, games_per_pair: int,
+                    playoff_teams: int, series_length: int, chunk_size: int,
+                    seed: np.random.SeedSequence) -> Dict[str, np.ndarray]:
+    """Simule `n_sims` saisons ou tableaux et retourne les compteurs"""
+    rng = np.random.default_rng(seed)
+    n_teams = len(probabilities)
+    series = series_probabilities(probabilities, series_length).astype(np.float32)
+    slots_order = bracket_order(playoff_teams)
+
+    # Round-robin : une colonne par paire (i < j) et sa matrice d'incidence
+    pair_i, pair_j = np.triu_indices(n_teams, k=1)
+    pair_p = probabilities[pair_i, pair_j].astype(np.float32)
+    incidence_i = np.zeros((len(pair_i), n_teams), dtype=np.float32)
+    incidence_j = np.zeros((len(pair_i), n_teams), dtype=np.float32)
+    incidence_i[np.arange(len(pair_i)), pair_i] = 1
+    incidence_j[np.arange(len(pair_i)), pair_j] = 1
+    # En mode bracket, tête de série = rang de la force (probabilité moyenne de victoire)
+    fixed_order = np.argsort(-probabilities.mean(axis=1), kind="stable")
+
+    counts = {
+        "title": np.zeros(n_teams, dtype=np.int64),
+        "final": np.zeros(n_teams, dtype=np.int64),
+        "seed": np.zeros((n_teams, n_teams), dtype=np.int64),
+        "wins": np.zeros(n_teams, dtype=np.float64),
+    }
+    done = 0
+    while done < n_sims:
+        n = min(chunk_size, n_sims - done)
+        if mode == "season":
+            if games_per_pair == 1:
+                pair_wins = (rng.random((n, len(pair_p)), dtype=np.float32) < pair_p).astype(np.float32)
+            else:
+                pair_wins = rng.binomial(games_per_pair, pair_p, size=(n, len(pair_p))).astype(np.float32)
+            wins = pair_wins @ incidence_i + (games_per_pair - pair_wins) @ incidence_j
+            counts["wins"] += wins.sum(axis=0)
+            # Classement : victoires, égalités départagées au hasard
+            order = np.argsort(-(wins + rng.random(wins.shape, dtype=np.float32)), axis=1)
+            seeds = np.broadcast_to(np.arange(n_teams), order.shape)
+            counts["seed"] += np.bincount((order * n_teams + seeds).ravel(),
+                                          minlength=n_teams * n_teams).reshape(n_teams, n_teams)
+        else:
+            order = np.broadcast_to(fixed_order, (n, n_teams))
+            counts["seed"][fixed_order, np.arange(n_teams)] += n
+
+        # Playoffs : tableau à élimination directe des `playoff_teams` premières têtes de série
+        slots = order[:, slots_order]
+        while slots.shape[1] > 1:
+            if slots.shape[1] == 2:
+                counts["final"] += np.bincount(slots.ravel(), minlength=n_teams)
+            home, away = slots[:, 0::2], slots[:, 1::2]
+            home_wins = rng.random(home.shape, dtype=np.float32) < series[home, away]
+            slots = np.where(home_wins, home, away)
+        counts["title"] += np.bincount(slots[:, 0], minlength=n_teams)
+        done += n
+    return counts
+
+
+class TournamentSimulator:
+    """Simulateur Monte Carlo à partir des forces (winrates prédits) des équipes"""
+    def __init__(self, strengths, teams: Optional[List[str]] = None, games_per_pair: int = 1,
+                 playoff_teams: int = 16, series_length: int = 7):
+        self.strengths = np.asarray(strengths, dtype=np.float64)
+        self.teams = list(teams) if teams is not None else [f"Équipe {i + 1}" for i in range(len(self.strengths))]
+        if playoff_teams > len(self.strengths):
+            raise ValueError(f"{playoff_teams} équipes en playoffs pour {len(self.strengths)} équipes")
+        bracket_order(playoff_teams)
+        self.games_per_pair = games_per_pair
+        self.playoff_teams = playoff_teams
+        self.series_length = series_length
+        self.probabilities = log5(self.strengths)
+
+    @classmethod
+    def from_lineups(cls, predictor: LineupPredictor, lineups, teams: Optional[List[str]] = None,
+                     store: Optional[PlayerStore] = None, **kwargs) -> 'TournamentSimulator':
+        """Forces obtenues en un seul appel batch de LineupPredictor.score_lineups"""
+        strengths, _ = predictor.score_lineups(lineups, store)
+        return cls(strengths, teams, **kwargs)
+
+    def simulate(self, n_sims: int = 10000, mode: str = "season", workers: int = 1,
+                 chunk_size: int = 8192, seed: Optional[int] = None) -> Dict:
+        """
+        Lance `n_sims` simulations (réparties sur `workers` processus) et retourne
+        les cotes de titre et la distribution des têtes de série.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Mode inconnu : {mode} (disponibles : {MODES})")
+        start = time.perf_counter()
+        shard_sizes = [n_sims // workers + (i < n_sims % workers) for i in range(workers)]
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        args = [(self.probabilities, size, mode, self.games_per_pair, self.playoff_teams,
+                 self.series_length, chunk_size, shard_seed)
+                for size, shard_seed in zip(shard_sizes, seeds) if size > 0]
+        if workers == 1:
+            shards = [_simulate_shard(*shard_args) for shard_args in args]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                shards = list(pool.map(_simulate_shard, *zip(*args)))
+        counts = {key: sum(shard[key] for shard in shards) for key in shards[0]}
+        elapsed = time.perf_counter() - start
+
+        odds = pd.DataFrame({
+            "team": self.teams,
+            "strength": self.strengths,
+            "title_odds": counts["title"] / n_sims,
+            "final_odds": counts["final"] / n_sims,
+            "playoff_odds": counts["seed"][:, :self.playoff_teams].sum(axis=1) / n_sims,
+        })
+        if mode == "season":
+            odds["mean_wins"] = counts["wins"] / n_sims
+        odds = odds.sort_values("title_odds", ascending=False, kind="stable").reset_index(drop=True)
+        seed_distribution = pd.DataFrame(
+            counts["seed"] / n_sims, index=self.teams,
+            columns=[f"seed_{k + 1}" for k in range(len(self.teams))]
+        )
+        return {
+            "title_odds": odds,
+            "seed_distribution": seed_distribution,
+            "sims": n_sims,
+            "elapsed": elapsed,
+            "sims_per_second": n_sims / elapsed if elapsed > 0 else float("inf"),
+        }
+
+
+def roster_lineups(df: pd.DataFrame, features: List[str], k: int = 5):
+    """Top k (points par match) de chaque équipe du CSV des effectifs -> (équipes, lineups, store)"""
+    top = top_n_per_group(df, ["team_name"], "pts_per_game", k).reset_index(drop=True)
+    teams, lineups = [], []
+    for team, rows in top.groupby("team_name", sort=True, observed=True).indices.items():
+        if len(rows) == k:
+            teams.append(team)
+            lineups.append(Lineup(rows))
+    # Positions inconnues pour les équipes existantes (cohérence "Positions inconnues")
+    return teams, lineups, PlayerStore(top, features, position_column=None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulation Monte Carlo de saisons NBA entre lineups")
+    parser.add_argument("--sims", type=int, default=100000)
+    parser.add_argument("--mode", default="season", choices=MODES)
+    parser.add_argument("--playoff-teams", type=int, default=16)
+    parser.add_argument("--games", type=int, default=1, help="matchs par paire en saison régulière")
+    parser.add_argument("--series", type=int, default=7, help="matchs par série de playoffs")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", default=None, help="CSV des cotes de titre")
+    args = parser.parse_args()
+
+    predictor = LineupPredictor()
+    predictor.load_data(artifact_path=get_registry().file("lineup_predictor.pkl"))
+    teams, lineups, store = roster_lineups(load_dataset("prefab_teams"), predictor.features)
+    simulator = TournamentSimulator.from_lineups(
+        predictor, lineups, teams, store=store, games_per_pair=args.games,
+        playoff_teams=min(args.playoff_teams, 1 << (len(teams).bit_length() - 1)),
+        series_length=args.series,
+    )
+    result = simulator.simulate(args.sims, mode=args.mode, workers=args.workers, seed=args.seed)
+
+    print(result["title_odds"].head(10).to_string(index=False))
+    print(f"{result['sims']} simulations en {result['elapsed']:.2f}s "
+          f"({result['sims_per_second']:.0f} / s, {args.workers} processus)")
+    if args.output:
+        result["title_odds"].to_csv(args.output, sep=";", index=False)
+        print(f"Cotes sauvegardées dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
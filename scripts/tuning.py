@@ -0,0 +1,174 @@
+"""
+Recherche d'hyperparamètres par successive halving.
+
+Remplace fine_tune_model du notebook (GridSearchCV exhaustif sur 108 configurations
+RF / 81 GB, lancé tous les cinq ans seulement) : HalvingGridSearchCV évalue toutes
+les configurations avec peu d'arbres (ou peu d'échantillons), ne garde que le
+meilleur tiers à chaque tour et n'entraîne le budget complet que sur les
+finalistes. Les résultats sont mis en cache dans un fichier JSON par empreinte du
+jeu d'entraînement : une saison déjà réglée ne coûte plus rien.
+"""
+
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingGridSearchCV, KFold
+
+# Grilles du notebook
+PARAM_GRIDS = {
+    'rf': {
+        'n_estimators': [50, 100, 200],
+        'max_depth': [None, 10, 20, 30],
+        'min_samples_split': [2, 5, 10],
+        'min_samples_leaf': [1, 2, 4],
+    },
+    'gb': {
+        'n_estimators': [50, 100, 200],
+        'max_depth': [3, 5, 7],
+        'learning_rate': [0.01, 0.1, 0.2],
+        'subsample': [0.8, 0.9, 1.0],
+    },
+}
+ESTIMATORS = {'rf': RandomForestRegressor, 'gb': GradientBoostingRegressor}
+# Budget : nombre d'arbres (le plus grand de la grille au dernier tour) ou nombre d'échantillons
+RESOURCES = ('n_estimators', 'n_samples')
+
+
+def make_estimator(model_type: str, **params):
+    """Modèle du notebook (random_state=42) avec les hyperparamètres donnés"""
+    return ESTIMATORS[model_type](random_state=42, **params)
+
+
+def fingerprint(X, y, model_type: str, resource: str, factor: int = 3, cv: int = 5) -> str:
+    """Empreinte du jeu d'entraînement et de la configuration de recherche"""
+    digest = hashlib.sha256()
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    digest.update(str(X.shape).encode())
+    digest.update(X.tobytes())
+    digest.update(np.ascontiguousarray(y, dtype=np.float64).tobytes())
+    config = {'model': model_type, 'grid': PARAM_GRIDS[model_type], 'resource': resource,
+              'factor': factor, 'cv': cv}
+    digest.update(json.dumps(config, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+class TuningCache:
+    """Résultats de recherche par empreinte, dans un fichier JSON"""
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self.entries.get(key)
+
+    def put(self, key: str, entry: Dict):
+        self.entries[key] = entry
+        if self.path:
+            # Écriture atomique, comme les autres artefacts
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+
+def tune(X, y, model_type: str = 'rf', resource: str = 'n_estimators', factor: int = 3,
+         cv: int = 5, n_jobs: int = -1) -> Dict:
+    """
+    Successive halving sur la grille du notebook, même validation croisée
+    (KFold 5, shuffle, random_state=42) et même score (RMSE).
+    """
+    if resource not in RESOURCES:
+        raise ValueError(f"Budget inconnu : {resource} (disponibles : {RESOURCES})")
+    grid = dict(PARAM_GRIDS[model_type])
+    kwargs = {}
+    if resource == 'n_estimators':
+        # Le nombre d'arbres devient le budget : plus une dimension de la grille
+        kwargs['max_resources'] = max(grid.pop('n_estimators'))
+
+    start = time.time()
+    search = HalvingGridSearchCV(
+        estimator=make_estimator(model_type),
+        param_grid=grid,
+        factor=factor,
+        resource=resource,
+        min_resources='exhaust',
+        cv=KFold(n_splits=cv, shuffle=True, random_state=42),
+        scoring='neg_root_mean_squared_error',
+        refit=False,
+        n_jobs=n_jobs,
+        **kwargs,
+    )
+    search.fit(np.asarray(X, dtype=np.float64), np.asarray(y, dtype=np.float64))
+
+    params = dict(search.best_params_)
+    if resource == 'n_estimators':
+        params['n_estimators'] = int(search.n_resources_[-1])
+    return {
+        'model': model_type,
+        'params': {name: (value.item() if isinstance(value, np.generic) else value)
+                   for name, value in params.items()},
+        'rmse': float(-search.best_score_),
+        'time': time.time() - start,
+        'candidates': int(search.n_candidates_[0]),
+        'iterations': int(search.n_iterations_),
+        'resource': resource,
+        'date': datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def tune_cached(X, y, cache: TuningCache, model_type: str = 'rf', resource: str = 'n_estimators',
+                search: bool = True, **kwargs) -> Tuple[Optional[Dict], bool]:
+    """
+    (résultat, lu dans le cache ?) pour ce jeu d'entraînement.
+    search=False : cache seul, résultat None s'il n'y est pas.
+    """
+    key = fingerprint(X, y, model_type, resource, kwargs.get('factor', 3), kwargs.get('cv', 5))
+    entry = cache.get(key)
+    if entry is not None or not search:
+        return entry, entry is not None
+    entry = tune(X, y, model_type, resource, **kwargs)
+    cache.put(key, entry)
+    return entry, False
+
+
+def tune_seasons(folds: Iterable[Tuple[str, pd.DataFrame, pd.Series]], cache: TuningCache,
+                 model_type: str = 'rf', resource: str = 'n_estimators',
+                 budget: Optional[float] = None, **kwargs) -> Tuple[Dict[str, Dict], pd.DataFrame]:
+    """
+    Règle le modèle pour chaque saison (jeu d'entraînement sans la saison). Si le
+    budget en secondes est épuisé, les saisons restantes non présentes dans le
+    cache reprennent les derniers paramètres trouvés, comme le notebook entre deux
+    recherches. Le budget est vérifié avant chaque recherche : la dernière lancée
+    peut le dépasser de toute sa durée. Retourne les paramètres par saison et le
+    journal (temps, RMSE).
+    """
+    params, log = {}, []
+    spent, last = 0.0, None
+    for season, X, y in folds:
+        search = budget is None or spent < budget or last is None
+        entry, cached = tune_cached(X, y, cache, model_type, resource, search=search, **kwargs)
+        status = 'cache' if cached else 'tuned'
+        if entry is None:
+            entry, status = last, 'reused'
+        elif not cached:
+            spent += entry['time']
+        last = entry
+        params[season] = entry['params']
+        log.append({
+            'season': season, 'model': model_type, 'status': status,
+            'best_rmse': entry['rmse'] if status != 'reused' else np.nan,
+            'time': entry['time'] if status == 'tuned' else 0.0,
+            **{f'param_{name}': value for name, value in entry['params'].items()},
+        })
+    return params, pd.DataFrame(log)